@@ -0,0 +1,98 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : import_time.py
+
+Measure how long the report modules take to import and how long a
+report that fails its option validation takes from start to finish
+against the local mock Code Insight server.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py -runs 20
+
+Every measurement is a separate python process so nothing is already
+imported.  The median of the runs is reported.
+'''
+import sys
+import os
+import argparse
+import json
+import time
+import statistics
+import tempfile
+import subprocess
+
+benchmarkDirectory = os.path.dirname(os.path.realpath(__file__))
+reportDirectory = os.path.dirname(benchmarkDirectory)
+sys.path.insert(0, reportDirectory)
+
+import mock_server
+import create_report
+
+# Modules timed on their own with python -X importtime
+reportModules = ["create_report", "report_session", "report_data", "report_async", "report_artifacts", "report_errors"]
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-runs", "--runs", type=int, default=10, help="Processes started for each measurement")
+
+#----------------------------------------------------------------------#
+def main():
+    args = parser.parse_args()
+
+    print("%-28s %12s" %("measurement", "median (ms)"))
+
+    interpreterTimes = [time_process([sys.executable, "-c", "pass"]) for _ in range(args.runs)]
+    print("%-28s %12.1f" %("python startup", statistics.median(interpreterTimes) * 1000))
+
+    for reportModule in reportModules:
+        importTimes = [get_import_time(reportModule) for _ in range(args.runs)]
+        print("%-28s %12.1f" %("import " + reportModule, statistics.median(importTimes) * 1000))
+
+    # A report with invalid options only creates and uploads the error report
+    mockServer = mock_server.MockCodeInsight(0, 0, 0)
+    baseURL = mockServer.start()
+
+    try:
+        errorReportTimes = [time_error_report(baseURL) for _ in range(args.runs)]
+    finally:
+        mockServer.stop()
+
+    print("%-28s %12.1f" %("error report (end to end)", statistics.median(errorReportTimes) * 1000))
+
+#----------------------------------------------------------------------#
+def time_process(processCommand, workingDirectory=reportDirectory):
+
+    startTime = time.perf_counter()
+    subprocess.run(processCommand, cwd=workingDirectory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - startTime
+
+#----------------------------------------------------------------------#
+def get_import_time(reportModule):
+
+    importProcess = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + reportModule], cwd=reportDirectory, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+
+    # Lines are "import time: self [us] | cumulative | imported package" and the module itself is listed last
+    for importLine in reversed(importProcess.stderr.decode("utf-8").splitlines()):
+        importFields = importLine.split("|")
+        if len(importFields) == 3 and importFields[2].strip() == reportModule:
+            return int(importFields[1]) / 1000000
+
+    return 0.0
+
+#----------------------------------------------------------------------#
+def time_error_report(baseURL):
+
+    reportOptionsArgument = create_report.quote_report_options(json.dumps({"includeChildProjects" : "true", "concurrentRequests" : "0"}))
+
+    reportCommand = [sys.executable, os.path.join(reportDirectory, "create_report.py"), "-pid", "1", "-rid", "1", "-authToken", "benchmark", "-baseURL", baseURL, "-reportOpts", reportOptionsArgument]
+
+    # The report artifacts are written to the working directory so keep them out of the repository
+    with tempfile.TemporaryDirectory() as workingDirectory:
+        return time_process(reportCommand, workingDirectory)
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : mock_server.py
+
+A local stand in for the Code Insight REST endpoints used by the report
+with a synthetic project hierarchy, tasks and users.  Used by the
+benchmarks but can also be run directly to point a report at it.
+
+    python benchmarks/mock_server.py -depth 3 -width 4 -tasks 500 -latency 0.02
+'''
+import argparse
+import json
+import threading
+import time
+import collections
+import http.server
+import urllib.parse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-depth", "--depth", type=int, default=2, help="Levels of child projects below the top level project")
+parser.add_argument("-width", "--width", type=int, default=3, help="Child projects per project")
+parser.add_argument("-tasks", "--tasksPerProject", type=int, default=100, help="Tasks per project")
+parser.add_argument("-users", "--numUsers", type=int, default=50, help="Distinct task owners and creators")
+parser.add_argument("-latency", "--latency", type=float, default=0.0, help="Seconds added to every response")
+parser.add_argument("-port", "--port", type=int, default=0, help="Port to listen on (0 picks a free port)")
+
+taskTypes = ["Review task", "Legal task", "Security task"]
+taskPriorities = ["High", "Medium", "Low"]
+
+#----------------------------------------------------------------------#
+class MockCodeInsight(object):
+    '''
+    Serve a synthetic Code Insight instance on a background thread.
+    Project 1 is the top of a hierarchy of the given depth and width,
+    every project has the same number of tasks and each request is
+    delayed by latency seconds.  Requests and uploaded bytes are counted
+    per endpoint.  Throttled, failed or slow task requests can be
+    injected and task query parameters rejected to exercise the report's
+    error handling.
+    '''
+
+    def __init__(self, depth=2, width=3, tasksPerProject=100, numUsers=50, latency=0.0, port=0):
+        self.tasksPerProject = tasksPerProject
+        self.numUsers = max(1, numUsers)
+        self.latency = latency
+
+        self.childProjects = create_hierarchy(depth, width)
+        self.requestCounts = collections.Counter()
+        self.uploadedBytes = 0
+        self.countLock = threading.Lock()
+
+        self.taskFaults = collections.deque()  # (statusCode, delay, retryAfter) for each of the next task requests
+        self.rejectedParameters = set()  # Task query parameters answered with a 400
+
+        mockServer = self
+
+        class RequestHandler(MockRequestHandler):
+            server_mock = mockServer
+
+        self.httpServer = http.server.ThreadingHTTPServer(("127.0.0.1", port), RequestHandler)
+        self.httpServer.daemon_threads = True
+        self.baseURL = "http://127.0.0.1:%s" %self.httpServer.server_port
+
+    #------------------------------------------------------------------#
+    def start(self):
+        threading.Thread(target=self.httpServer.serve_forever, daemon=True).start()
+        return self.baseURL
+
+    #------------------------------------------------------------------#
+    def stop(self):
+        self.httpServer.shutdown()
+        self.httpServer.server_close()
+
+    #------------------------------------------------------------------#
+    def count_request(self, endpoint, uploadedBytes=0):
+        with self.countLock:
+            self.requestCounts[endpoint] += 1
+            self.uploadedBytes += uploadedBytes
+
+    #------------------------------------------------------------------#
+    def reset_counts(self):
+        with self.countLock:
+            self.requestCounts = collections.Counter()
+            self.uploadedBytes = 0
+
+    #------------------------------------------------------------------#
+    def inject_task_faults(self, numRequests, statusCode=200, delay=0.0, retryAfter=None):
+        # The next numRequests task requests are delayed and answered with statusCode instead of tasks unless it is 200
+        with self.countLock:
+            self.taskFaults.extend([(statusCode, delay, retryAfter)] * numRequests)
+
+    #------------------------------------------------------------------#
+    def take_task_fault(self):
+        with self.countLock:
+            return self.taskFaults.popleft() if self.taskFaults else None
+
+    #------------------------------------------------------------------#
+    def get_project(self, projectID, recursive):
+        projectNode = {"id" : projectID, "name" : "Project %s" %projectID, "childProject" : []}
+
+        for childProjectID in self.childProjects.get(projectID, []):
+            if recursive:
+                projectNode["childProject"].append(self.get_project(childProjectID, True))
+            else:
+                projectNode["childProject"].append({"id" : childProjectID, "name" : "Project %s" %childProjectID, "childProject" : []})
+
+        return projectNode
+
+    #------------------------------------------------------------------#
+    def get_tasks(self, projectID, offset, limit):
+        # Offsets are page numbers starting at 1
+        firstTask = (offset - 1) * limit
+        return [create_task(projectID, taskNumber, self.numUsers) for taskNumber in range(firstTask, min(firstTask + limit, self.tasksPerProject))]
+
+    #------------------------------------------------------------------#
+    def get_user(self, userID):
+        return {"id" : userID, "firstName" : "User", "lastName" : str(userID)}
+
+#----------------------------------------------------------------------#
+class MockRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_mock = None
+
+    #------------------------------------------------------------------#
+    def do_GET(self):
+        mockServer = self.server_mock
+        requestURL = urllib.parse.urlparse(self.path)
+        endpoint = requestURL.path.replace("/codeinsight/api/", "")
+        queryParameters = dict(urllib.parse.parse_qsl(requestURL.query))
+
+        if mockServer.latency:
+            time.sleep(mockServer.latency)
+
+        if endpoint.startswith("project/") and endpoint.endswith("/childProjects"):
+            mockServer.count_request("childProjects")
+            projectID = int(endpoint.split("/")[1])
+            self.send_json({"data" : mockServer.get_project(projectID, queryParameters.get("recursive") == "true")})
+
+        elif endpoint == "tasks":
+            mockServer.count_request("tasks")
+            taskFault = mockServer.take_task_fault()
+            if taskFault is not None:
+                statusCode, delay, retryAfter = taskFault
+                time.sleep(delay)
+                if statusCode != 200:
+                    self.send_json({"message" : "Injected %s" %statusCode}, statusCode, {"Retry-After" : str(retryAfter)} if retryAfter is not None else {})
+                    return
+
+            if mockServer.rejectedParameters.intersection(queryParameters):
+                self.send_json({"message" : "Unsupported parameter"}, 400)
+                return
+
+            if "updatedSince" in queryParameters:
+                taskPage = []  # The synthetic tasks never change
+            else:
+                taskPage = mockServer.get_tasks(int(queryParameters["projectId"]), int(queryParameters.get("offset", 1)), int(queryParameters.get("limit", 1000)))
+            self.send_json({"data" : taskPage})
+
+        elif endpoint == "users":
+            mockServer.count_request("users")
+            if "id" in queryParameters:
+                self.send_json({"data" : [mockServer.get_user(int(queryParameters["id"]))]})
+            else:
+                offset = int(queryParameters.get("offset", 1))
+                limit = int(queryParameters.get("limit", 1000))
+                userIDs = range((offset - 1) * limit, min(offset * limit, mockServer.numUsers))
+                self.send_json({"data" : [mockServer.get_user(userID) for userID in userIDs]})
+
+        else:
+            mockServer.count_request("unknown")
+            self.send_json({"message" : "Unknown endpoint %s" %endpoint}, 404)
+
+    #------------------------------------------------------------------#
+    def do_POST(self):
+        mockServer = self.server_mock
+
+        # Read and discard the report upload whether or not it is chunked
+        uploadedBytes = 0
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                chunkSize = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if chunkSize == 0:
+                    self.rfile.readline()
+                    break
+                uploadedBytes += len(self.rfile.read(chunkSize))
+                self.rfile.readline()
+        else:
+            uploadedBytes = len(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+        mockServer.count_request("upload", uploadedBytes)
+        self.send_json({"message" : "Report data uploaded"})
+
+    #------------------------------------------------------------------#
+    def send_json(self, responseData, statusCode=200, responseHeaders=None):
+        responseBody = json.dumps(responseData).encode("utf-8")
+
+        self.send_response(statusCode)
+        self.send_header("Content-Type", "application/json")
+        for headerName, headerValue in (responseHeaders or {}).items():
+            self.send_header(headerName, headerValue)
+        self.send_header("Content-Length", str(len(responseBody)))
+        self.end_headers()
+        self.wfile.write(responseBody)
+
+    #------------------------------------------------------------------#
+    def log_message(self, *args):
+        pass
+
+#----------------------------------------------------------------------#
+def create_hierarchy(depth, width):
+
+    # Project IDs are assigned level by level starting with 1 for the top level project
+    childProjects = {}
+    projectLevel = [1]
+    nextProjectID = 2
+
+    for _ in range(depth):
+        nextProjectLevel = []
+        for projectID in projectLevel:
+            childProjects[projectID] = list(range(nextProjectID, nextProjectID + width))
+            nextProjectLevel += childProjects[projectID]
+            nextProjectID += width
+        projectLevel = nextProjectLevel
+
+    return childProjects
+
+#----------------------------------------------------------------------#
+def create_task(projectID, taskNumber, numUsers):
+
+    task = {}
+    task["id"] = projectID * 1000000 + taskNumber
+    task["ownerId"] = taskNumber % numUsers
+    task["createdById"] = (taskNumber * 7) % numUsers
+    task["createdDate"] = "2023-%02d-%02d %02d:%02d:%02d" %(taskNumber % 12 + 1, taskNumber % 28 + 1, taskNumber % 24, taskNumber % 60, (taskNumber * 7) % 60)
+    task["closed"] = taskNumber % 3 == 0
+    task["taskName"] = taskTypes[taskNumber % 3]
+    task["inventoryId"] = 100000 + taskNumber
+    task["summary"] = "Review the license of component %s" %taskNumber
+    task["priority"] = taskPriorities[taskNumber % 3]
+    task["almIssues"] = [{"externalUrl" : "https://jira.example.com/browse/CI-%s" %taskNumber, "externalKey" : "CI-%s" %taskNumber}] if taskNumber % 10 == 0 else []
+
+    return task
+
+#----------------------------------------------------------------------#
+def main():
+    args = parser.parse_args()
+
+    mockServer = MockCodeInsight(args.depth, args.width, args.tasksPerProject, args.numUsers, args.latency, args.port)
+    baseURL = mockServer.start()
+
+    print("Mock Code Insight server running at %s with %s projects" %(baseURL, len(mockServer.childProjects) * args.width + 1))
+    print("Press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mockServer.stop()
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    main()
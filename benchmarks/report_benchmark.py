@@ -0,0 +1,118 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_benchmark.py
+
+Run create_report.py end to end against the local mock Code Insight
+server for a set of synthetic hierarchies and report the wall time,
+REST API calls, upload size and peak memory of each run.
+
+    python benchmarks/report_benchmark.py
+    python benchmarks/report_benchmark.py -scenario wide -runs 3 -latency 0.05
+    python benchmarks/report_benchmark.py -depth 4 -width 5 -tasks 200 -reportOpts '{"streamTaskData" : "true"}'
+
+Each run is a separate python process so the peak memory is that of the
+report alone.  The first run of a scenario starts with empty caches for
+the mock server while later runs reuse them.
+'''
+import sys
+import os
+import argparse
+import json
+import time
+import tempfile
+import subprocess
+
+benchmarkDirectory = os.path.dirname(os.path.realpath(__file__))
+reportDirectory = os.path.dirname(benchmarkDirectory)
+sys.path.insert(0, reportDirectory)
+
+import mock_server
+import create_report
+import report_metrics
+
+scenarios = [
+    {"name" : "single", "depth" : 0, "width" : 0, "tasksPerProject" : 2000},
+    {"name" : "small", "depth" : 2, "width" : 3, "tasksPerProject" : 100},
+    {"name" : "wide", "depth" : 1, "width" : 100, "tasksPerProject" : 200},
+    {"name" : "deep", "depth" : 6, "width" : 2, "tasksPerProject" : 50},
+]
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-scenario", "--scenario", action="append", help="Name of a scenario to run (may be repeated).  All scenarios run by default")
+parser.add_argument("-depth", "--depth", type=int, help="Run a custom scenario with this hierarchy depth")
+parser.add_argument("-width", "--width", type=int, default=3, help="Child projects per project for a custom scenario")
+parser.add_argument("-tasks", "--tasksPerProject", type=int, default=100, help="Tasks per project for a custom scenario")
+parser.add_argument("-users", "--numUsers", type=int, default=50, help="Distinct task owners and creators")
+parser.add_argument("-latency", "--latency", type=float, default=0.0, help="Seconds added to every mock server response")
+parser.add_argument("-runs", "--runs", type=int, default=2, help="Report runs per scenario")
+parser.add_argument("-reportOpts", "--reportOptions", default="{}", help="Report options (JSON) added to the defaults")
+
+defaultReportOptions = {"includeChildProjects" : "true"}
+
+#----------------------------------------------------------------------#
+def main():
+    args = parser.parse_args()
+
+    reportOptions = dict(defaultReportOptions, **json.loads(args.reportOptions))
+
+    if args.depth is not None:
+        selectedScenarios = [{"name" : "custom", "depth" : args.depth, "width" : args.width, "tasksPerProject" : args.tasksPerProject}]
+    elif args.scenario:
+        selectedScenarios = [scenario for scenario in scenarios if scenario["name"] in args.scenario]
+    else:
+        selectedScenarios = scenarios
+
+    print("Report options: %s" %json.dumps(reportOptions))
+    print("%-8s %4s %9s %9s %9s %8s %11s %10s %9s" %("scenario", "run", "projects", "tasks", "wall (s)", "requests", "api (MB)", "upload (MB)", "rss (MB)"))
+
+    for scenario in selectedScenarios:
+        mockServer = mock_server.MockCodeInsight(scenario["depth"], scenario["width"], scenario["tasksPerProject"], args.numUsers, args.latency)
+        baseURL = mockServer.start()
+
+        try:
+            for runNumber in range(1, args.runs + 1):
+                mockServer.reset_counts()
+                runResults = run_report(baseURL, reportOptions)
+
+                if runResults is None:
+                    print("%-8s %4s  report failed" %(scenario["name"], runNumber))
+                    continue
+
+                counts = runResults["counts"]
+                print("%-8s %4s %9s %9s %9.2f %8s %11.2f %10.2f %9s" %(scenario["name"], runNumber, counts.get("projects", 0), counts.get("tasks", 0), runResults["wallSeconds"],
+                    sum(mockServer.requestCounts.values()), counts.get("apiBytes", 0) / 1048576, mockServer.uploadedBytes / 1048576,
+                    "%.1f" %(runResults["peakRSSBytes"] / 1048576) if runResults["peakRSSBytes"] else "n/a"))
+        finally:
+            mockServer.stop()
+
+#----------------------------------------------------------------------#
+def run_report(baseURL, reportOptions):
+
+    reportOptionsArgument = create_report.quote_report_options(json.dumps(reportOptions))
+
+    reportCommand = [sys.executable, os.path.join(reportDirectory, "create_report.py"), "-pid", "1", "-rid", "1", "-authToken", "benchmark", "-baseURL", baseURL, "-reportOpts", reportOptionsArgument]
+
+    # The report artifacts are written to the working directory so keep them out of the repository
+    with tempfile.TemporaryDirectory() as workingDirectory:
+        startTime = time.perf_counter()
+        reportProcess = subprocess.run(reportCommand, cwd=workingDirectory, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        wallSeconds = time.perf_counter() - startTime
+
+    if reportProcess.returncode != 0:
+        print(reportProcess.stderr.decode("utf-8", "replace"))
+        return None
+
+    # The report writes its own timings and counts at the end of each run
+    with open(report_metrics.metricsFile) as metrics_ptr:
+        runResults = json.load(metrics_ptr)
+
+    runResults["wallSeconds"] = wallSeconds
+    return runResults
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    main()
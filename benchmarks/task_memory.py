@@ -0,0 +1,95 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : task_memory.py
+
+Compare the memory held per task by the original per task dict with
+the TaskRecord used by report_data.
+
+    python benchmarks/task_memory.py -tasks 200000
+'''
+import sys
+import os
+import argparse
+import contextlib
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import report_data
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-tasks", "--numTasks", type=int, default=100000, help="Number of synthetic tasks to create")
+
+#----------------------------------------------------------------------#
+def main():
+    args = parser.parse_args()
+    numTasks = args.numTasks
+
+    userData = {userID : "User %s" %userID for userID in range(50)}
+
+    print("Measuring memory for %s tasks" %numTasks)
+
+    dictBytes = measure_task_memory(create_task_dict, numTasks, userData)
+    recordBytes = measure_task_memory(report_data.create_task_details, numTasks, userData)
+
+    print("    dict per task:       %6d bytes  (%.1f MB total)" %(dictBytes / numTasks, dictBytes / 1048576))
+    print("    TaskRecord per task: %6d bytes  (%.1f MB total)" %(recordBytes / numTasks, recordBytes / 1048576))
+    print("    Reduction:           %.1fx" %(dictBytes / recordBytes))
+
+#----------------------------------------------------------------------#
+def measure_task_memory(createTask, numTasks, userData):
+
+    # Build the REST payloads first so only the report's copy of each task is measured
+    taskPayloads = [create_task_payload(taskNumber) for taskNumber in range(numTasks)]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tracemalloc.start()
+        tasks = [createTask(task, userData) for task in taskPayloads]
+        allocatedBytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    del tasks
+    return allocatedBytes
+
+#----------------------------------------------------------------------#
+def create_task_payload(taskNumber):
+
+    task = {}
+    task["id"] = taskNumber
+    task["ownerId"] = taskNumber % 50
+    task["createdById"] = (taskNumber * 7) % 50
+    task["createdDate"] = "2023-%02d-%02d %02d:%02d:%02d" %(taskNumber % 12 + 1, taskNumber % 28 + 1, taskNumber % 24, taskNumber % 60, (taskNumber * 7) % 60)
+    task["closed"] = taskNumber % 3 == 0
+    task["taskName"] = ["Review task", "Legal task", "Security task"][taskNumber % 3]
+    task["inventoryId"] = 100000 + taskNumber
+    task["summary"] = "Review the license of component %s" %taskNumber
+    task["priority"] = ["High", "Medium", "Low"][taskNumber % 3]
+    task["almIssues"] = [{"externalUrl" : "https://jira.example.com/browse/CI-%s" %taskNumber, "externalKey" : "CI-%s" %taskNumber, "status" : "Open", "id" : taskNumber}] if taskNumber % 10 == 0 else []
+
+    return task
+
+#----------------------------------------------------------------------#
+def create_task_dict(task, userData):
+    # The per task dict built by report_data before TaskRecord was introduced
+    createdDate, createdTime = task["createdDate"].split(" ")
+
+    projectTaskData = {}
+    projectTaskData["inventoryId"] = task["inventoryId"]
+    projectTaskData["summary"] = task["summary"]
+    projectTaskData["priority"] = task["priority"]
+    projectTaskData["almIssues"] = task["almIssues"]
+    projectTaskData["taskCreator"] = userData[task["createdById"]]
+    projectTaskData["taskOwner"] = userData[task["ownerId"]]
+    projectTaskData["createdDate"] = createdDate
+    projectTaskData["createdTime"] = createdTime
+    projectTaskData["taskStatus"] = "Closed" if task["closed"] else "Open"
+    projectTaskData["taskType"] = task["taskName"].split(" ")[0]
+
+    return projectTaskData
+
+
+#----------------------------------------------------------------------#    
+if __name__ == "__main__":
+    main()
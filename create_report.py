@@ -11,31 +11,42 @@ import sys
 import logging
 import argparse
 import zipfile
+import tempfile
+import shutil
+import threading
 import os
 import json
 from datetime import datetime
 import re
 
 import _version
-import report_data
-import report_artifacts
-import report_errors
-
-import CodeInsight_RESTAPIs.project.upload_reports
+import report_metrics
+import report_profile
+import report_logging
 
 ###################################################################################
 # Test the version of python to make sure it's at least the version the script
 # was tested on, otherwise there could be unexpected results
-if sys.version_info <= (3, 5):
-    raise Exception("The current version of Python is less than 3.5 which is unsupported.\n Script created/tested against python version 3.8.1. ")
+if sys.version_info < (3, 7):
+    raise Exception("The current version of Python is less than 3.7 which is unsupported.\n Script created/tested against python version 3.8.1. ")
 else:
     pass
 
 logfileName = os.path.dirname(os.path.realpath(__file__)) + "/_project_task_report.log"
 
+defaultConcurrentRequests = "8"  # Used if the report was registered without the option
+maxConcurrentRequests = 32
+defaultCompressionLevel = 6  # zlib level used for the report archives
+archiveSpoolSize = 64 * 1024 * 1024  # Bytes of the downloadable archive held in memory before spilling to a temp file
+archiveCopySize = 1024 * 1024  # Bytes copied at a time into the upload archive
+uploadProgressInterval = 10 * 1024 * 1024  # Bytes uploaded between progress messages
+
 ###################################################################################
 #  Set up logging handler to allow for different levels of logging to be capture
-logging.basicConfig(format='%(asctime)s,%(msecs)d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s', datefmt='%Y-%m-%d:%H:%M:%S', filename=logfileName, filemode='w',level=logging.DEBUG)
+#  Records are written to the log file by a background thread.  The level can be
+#  changed with the logLevel report option or the PROJECT_TASK_REPORT_LOG_LEVEL
+#  environment variable.  Logging is configured by main so a process that only
+#  imports this module, such as a report rendering process, leaves the log alone
 logger = logging.getLogger(__name__)
 
 
@@ -49,73 +60,130 @@ parser.add_argument("-baseURL", "--baseURL", help="Code Insight Core Server Prot
 parser.add_argument("-reportOpts", "--reportOptions", help="Options for report content")
 
 #----------------------------------------------------------------------#
-def main():
+def main(commandLineArgs=None, sessionCache=None):
+	'''
+	commandLineArgs and sessionCache are given when the report is run by
+	the report worker, which keeps its sessions open between reports
+	'''
 
 	reportName = "Project Task Report"
 
+	report_logging.configure_logging(logfileName)
+
 	logger.info("Creating %s - %s" %(reportName, _version.__version__))
 	print("Creating %s - %s" %(reportName, _version.__version__))
 
+	if report_profile.profiling_requested():
+		report_profile.start_profiling("the %s environment variable" %report_profile.profileVariable)
+
 	# See what if any arguments were provided
-	args = parser.parse_args()
+	args = parser.parse_args(commandLineArgs)
 	projectID = args.projectID
 	reportID = args.reportID
 	authToken = args.authToken
 	baseURL = args.baseURL
 	reportOptions = args.reportOptions
 
-	# Based on how the shell pass the arguemnts clean up the options if on a linux system:w
-	if sys.platform.startswith('linux'):
-		reportOptions = reportOptions.replace('""', '"')[1:-1]
-
-	reportOptions = json.loads(reportOptions)
-	reportOptions = verifyOptions(reportOptions) 
-
-	logger.debug("Custom Report Provided Arguments:")	
-	logger.debug("    projectID:  %s" %projectID)	
-	logger.debug("    reportID:   %s" %reportID)	
-	logger.debug("    baseURL:  %s" %baseURL)	
-	logger.debug("    reportOptions:  %s" %reportOptions)	
-
-	fileNameTimeStamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-
-	# Did we fail the options validation?
-	if "errorMsg" in reportOptions.keys():
-		reportOptions["reportName"] = reportName
-		reportOptions["fileNameTimeStamp"] = fileNameTimeStamp
-		reportOptions["projectID"] = projectID
-		projectName = "Report_Creation_Error"
-		numProjects = 0  # No project information gathered
-		reports = report_errors.create_error_report(reportOptions)
-		print("    *** ERROR  ***  Error found validating report options")
-	else:
-		reportData = report_data.gather_data_for_report(baseURL, projectID, authToken, reportName, reportOptions)
-		print("    Report data has been collected")
-		reportData["fileNameTimeStamp"] = fileNameTimeStamp
-		projectName = reportData["projectName"]
-		numProjects = len(reportData["projectList"])
-
-		if "errorMsg" in reportData.keys():
-			reports = report_errors.create_error_report(reportData)
-			print("    Error report artifacts have been created")
-		else:
-			reports = report_artifacts.create_report_artifacts(reportData)
-			print("    Report artifacts have been created")
+	report_metrics.start_run(reportName, _version.__version__, projectID, reportID)
 
-	print("    Create report archive for upload")
-	uploadZipfile = create_report_zipfile(reports, reportName, projectName, projectID, numProjects, fileNameTimeStamp)
-	print("    Upload zip file creation completed")
-	CodeInsight_RESTAPIs.project.upload_reports.upload_project_report_data(baseURL, projectID, reportID, authToken, uploadZipfile)
-	print("    Report uploaded to Code Insight")
+	reportSession = None
+	try:
+		reportOptions = json.loads(unquote_report_options(reportOptions))
+		reportOptions = verifyOptions(reportOptions) 
 
+		# The REST and report modules pull in requests, xlsxwriter and asyncio so
+		# they are only imported once the run needs them
+		import report_session
 
-	#########################################################
-	# Remove the file since it has been uploaded to Code Insight
-	try:
-		os.remove(uploadZipfile)
-	except OSError:
-		logger.error("Error removing %s" %uploadZipfile)
-		print("Error removing %s" %uploadZipfile)
+		if reportOptions.get("logLevel") in report_logging.logLevels:
+			report_logging.set_log_level(reportOptions["logLevel"])
+
+		if reportOptions.get("profileReport") == "true":
+			report_profile.start_profiling("the profileReport report option")
+
+		logger.debug("Custom Report Provided Arguments:")	
+		logger.debug("    projectID:  %s" %projectID)	
+		logger.debug("    reportID:   %s" %reportID)	
+		logger.debug("    baseURL:  %s" %baseURL)	
+		logger.debug("    reportOptions:  %s" %reportOptions)	
+
+		fileNameTimeStamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+		# One pooled session is shared by every REST call made for this report
+		if "errorMsg" in reportOptions.keys():
+			poolSize = int(defaultConcurrentRequests)
+			compressionLevel = defaultCompressionLevel
+		else:
+			poolSize = reportOptions["concurrentRequests"]
+			compressionLevel = reportOptions["compressionLevel"]
+		if sessionCache is None:
+			reportSession = report_session.ReportSession(baseURL, authToken, poolSize)
+		else:
+			reportSession = sessionCache.get_session(baseURL, authToken, poolSize)
+
+		# Did we fail the options validation?
+		if "errorMsg" in reportOptions.keys():
+			reportOptions["reportName"] = reportName
+			reportOptions["fileNameTimeStamp"] = fileNameTimeStamp
+			reportOptions["projectID"] = projectID
+			projectName = "Report_Creation_Error"
+			numProjects = 0  # No project information gathered
+			import report_errors
+			reports = report_errors.create_error_report(reportOptions)
+			report_metrics.set_status("error")
+			print("    *** ERROR  ***  Error found validating report options")
+		else:
+			import report_data
+			# With streamed task data the tasks and users are collected during rendering
+			with report_metrics.phase("collection"):
+				reportData = report_data.gather_data_for_report(reportSession, projectID, reportName, reportOptions)
+			print("    Report data has been collected")
+			report_profile.take_snapshot("end of data collection")
+			reportData["fileNameTimeStamp"] = fileNameTimeStamp
+			projectName = reportData["projectName"]
+			numProjects = len(reportData["projectList"])
+
+			with report_metrics.phase("rendering"):
+				if "errorMsg" in reportData.keys():
+					import report_errors
+					reports = report_errors.create_error_report(reportData)
+					report_metrics.set_status("error")
+					print("    Error report artifacts have been created")
+				else:
+					import report_artifacts
+					reports = report_artifacts.create_report_artifacts(reportData)
+					report_metrics.set_status("success")
+					print("    Report artifacts have been created")
+			report_profile.take_snapshot("end of rendering")
+
+		# The archive is written to a pipe on another thread and uploaded as it is
+		# created so it never has to exist on disk or in memory as a whole
+		print("    Create report archive and upload to Code Insight")
+		uploadZipfile = get_report_zipfile_name(reportName, projectName, projectID, numProjects, fileNameTimeStamp).replace(".zip", "_upload.zip")
+		uploadPipe = report_session.UploadPipe()
+		archiveWriter = threading.Thread(target=write_report_archive, args=(uploadPipe, reports, reportName, projectName, projectID, numProjects, fileNameTimeStamp, compressionLevel))
+		archiveWriter.start()
+
+		with report_metrics.phase("archiveAndUpload"):
+			try:
+				reportSession.upload_project_report_stream(projectID, reportID, uploadZipfile, uploadPipe, report_upload_progress)
+			finally:
+				uploadPipe.cancel()
+				archiveWriter.join()
+
+		print("    Report uploaded to Code Insight")
+	except BaseException:
+		# Failed runs are recorded too since they are the ones the metrics are most needed for
+		report_metrics.set_status("failed")
+		report_metrics.finish_run(reportSession.get_request_summary() if reportSession is not None else None)
+		raise
+
+	report_metrics.finish_run(reportSession.get_request_summary())
+	if sessionCache is None:
+		reportSession.close()
+	else:
+		reportSession.log_request_summary()
+	report_profile.stop_profiling()
 
 	logger.info("Completed creating %s" %reportName)
 	print("Completed creating %s" %reportName)
@@ -124,17 +192,66 @@ def main():
 
 
 
+#----------------------------------------------------------------------#
+def quote_report_options(reportOptions):
+	# Quote the options the way the Code Insight shell wrapper does when running the report from another script
+	if sys.platform.startswith('linux'):
+		return '"' + reportOptions.replace('"', '""') + '"'
+	return reportOptions
+
+#----------------------------------------------------------------------#
+def unquote_report_options(reportOptions):
+	# Based on how the shell pass the arguemnts clean up the options if on a linux system
+	if sys.platform.startswith('linux'):
+		return reportOptions.replace('""', '"')[1:-1]
+	return reportOptions
+
 #----------------------------------------------------------------------# 
 def verifyOptions(reportOptions):
 	'''
 	Expected Options for report:
 		includeChildProjects - True/False
+		concurrentRequests - Number of projects to collect data for at the same time (1-32)
+		incrementalSync - True/False
+		streamTaskData - True/False
+		collectionEngine - threads/asyncio
+		taskTableFormat - rows/json
+		reportShardSize - 0 for a single html file, tasks per html page or Project for a page per project
+		dataExports - None or a comma separated list of CSV/JSONL
+		compressionLevel - zlib compression level for the report archives (0-9)
+		hierarchyDiscovery - Recursive/Levels
+		profileReport - True/False
+		logLevel - Error/Warning/Info/Debug/Tasks (Debug plus the details of every task)
+		taskStatus - All/Open/Closed
+		taskPriority - All or a comma separated list of High/Medium/Low
+		taskType - All or a comma separated list of task types
+		taskOwner - All or a comma separated list of task owner names
+		createdFrom - Empty or the earliest task creation date (YYYY-MM-DD)
+		createdTo - Empty or the latest task creation date (YYYY-MM-DD)
 	'''
 	reportOptions["errorMsg"] = []
 	trueOptions = ["true", "t", "yes", "y"]
 	falseOptions = ["false", "f", "no", "n"]
 
 	includeChildProjects = reportOptions["includeChildProjects"]
+	# Optional so older registrations of the report continue to work
+	concurrentRequests = str(reportOptions.get("concurrentRequests", "")).strip() or defaultConcurrentRequests
+	incrementalSync = str(reportOptions.get("incrementalSync", "")).strip() or "false"
+	streamTaskData = str(reportOptions.get("streamTaskData", "")).strip() or "false"
+	collectionEngine = str(reportOptions.get("collectionEngine", "")).strip() or "threads"
+	taskTableFormat = str(reportOptions.get("taskTableFormat", "")).strip() or "rows"
+	reportShardSize = str(reportOptions.get("reportShardSize", "")).strip() or "0"
+	dataExports = str(reportOptions.get("dataExports", "")).strip() or "none"
+	compressionLevel = str(reportOptions.get("compressionLevel", "")).strip() or str(defaultCompressionLevel)
+	hierarchyDiscovery = str(reportOptions.get("hierarchyDiscovery", "")).strip() or "recursive"
+	profileReport = str(reportOptions.get("profileReport", "")).strip() or "false"
+	logLevel = str(reportOptions.get("logLevel", "")).strip() or report_logging.get_default_log_level()
+	taskStatus = str(reportOptions.get("taskStatus", "")).strip() or "all"
+	taskPriority = str(reportOptions.get("taskPriority", "")).strip() or "all"
+	taskType = str(reportOptions.get("taskType", "")).strip() or "all"
+	taskOwner = str(reportOptions.get("taskOwner", "")).strip() or "all"
+	createdFrom = str(reportOptions.get("createdFrom", "")).strip()
+	createdTo = str(reportOptions.get("createdTo", "")).strip()
 
 
 	if includeChildProjects.lower() in trueOptions:
@@ -143,6 +260,111 @@ def verifyOptions(reportOptions):
 		reportOptions["includeChildProjects"] = "false"
 	else:
 		reportOptions["errorMsg"].append("Invalid option for including child projects: <b>%s</b>.  Valid options are <b>True/False</b>" %includeChildProjects)
+
+	if concurrentRequests.isdigit() and 1 <= int(concurrentRequests) <= maxConcurrentRequests:
+		reportOptions["concurrentRequests"] = int(concurrentRequests)
+	else:
+		reportOptions["errorMsg"].append("Invalid option for concurrent requests: <b>%s</b>.  Valid options are <b>1-%s</b>" %(concurrentRequests, maxConcurrentRequests))
+
+	if incrementalSync.lower() in trueOptions:
+		reportOptions["incrementalSync"] = "true"
+	elif incrementalSync.lower() in falseOptions:
+		reportOptions["incrementalSync"] = "false"
+	else:
+		reportOptions["errorMsg"].append("Invalid option for incremental task sync: <b>%s</b>.  Valid options are <b>True/False</b>" %incrementalSync)
+
+	if streamTaskData.lower() in trueOptions:
+		reportOptions["streamTaskData"] = "true"
+	elif streamTaskData.lower() in falseOptions:
+		reportOptions["streamTaskData"] = "false"
+	else:
+		reportOptions["errorMsg"].append("Invalid option for streaming task data: <b>%s</b>.  Valid options are <b>True/False</b>" %streamTaskData)
+
+	if collectionEngine.lower() in ["threads", "asyncio"]:
+		reportOptions["collectionEngine"] = collectionEngine.lower()
+	else:
+		reportOptions["errorMsg"].append("Invalid option for collection engine: <b>%s</b>.  Valid options are <b>Threads/Asyncio</b>" %collectionEngine)
+
+	if taskTableFormat.lower() in ["rows", "json"]:
+		reportOptions["taskTableFormat"] = taskTableFormat.lower()
+	else:
+		reportOptions["errorMsg"].append("Invalid option for task table format: <b>%s</b>.  Valid options are <b>Rows/JSON</b>" %taskTableFormat)
+
+	if reportShardSize.isdigit():
+		reportOptions["reportShardSize"] = int(reportShardSize)
+	elif reportShardSize.lower() == "project":
+		reportOptions["reportShardSize"] = "project"
+	else:
+		reportOptions["errorMsg"].append("Invalid option for report page size: <b>%s</b>.  Valid options are <b>0</b>, a number of tasks per page or <b>Project</b>" %reportShardSize)
+
+	exportFormats = [exportFormat.strip().lower() for exportFormat in dataExports.split(",")]
+	if exportFormats == ["none"]:
+		reportOptions["dataExports"] = []
+	elif all(exportFormat in ["csv", "jsonl"] for exportFormat in exportFormats):
+		reportOptions["dataExports"] = sorted(set(exportFormats))
+	else:
+		reportOptions["errorMsg"].append("Invalid option for data exports: <b>%s</b>.  Valid options are <b>None</b> or a comma separated list of <b>CSV/JSONL</b>" %dataExports)
+
+	if compressionLevel.isdigit() and 0 <= int(compressionLevel) <= 9:
+		reportOptions["compressionLevel"] = int(compressionLevel)
+	else:
+		reportOptions["errorMsg"].append("Invalid option for archive compression level: <b>%s</b>.  Valid options are <b>0-9</b>" %compressionLevel)
+
+	if hierarchyDiscovery.lower() in ["recursive", "levels"]:
+		reportOptions["hierarchyDiscovery"] = hierarchyDiscovery.lower()
+	else:
+		reportOptions["errorMsg"].append("Invalid option for project hierarchy discovery: <b>%s</b>.  Valid options are <b>Recursive/Levels</b>" %hierarchyDiscovery)
+
+	if profileReport.lower() in trueOptions:
+		reportOptions["profileReport"] = "true"
+	elif profileReport.lower() in falseOptions:
+		reportOptions["profileReport"] = "false"
+	else:
+		reportOptions["errorMsg"].append("Invalid option for profiling the report: <b>%s</b>.  Valid options are <b>True/False</b>" %profileReport)
+
+	if logLevel.lower() in report_logging.logLevels:
+		reportOptions["logLevel"] = logLevel.lower()
+	else:
+		reportOptions["errorMsg"].append("Invalid option for log level: <b>%s</b>.  Valid options are <b>Error/Warning/Info/Debug/Tasks</b>" %logLevel)
+
+	if taskStatus.lower() in ["all", "open", "closed"]:
+		reportOptions["taskStatus"] = taskStatus.lower()
+	else:
+		reportOptions["errorMsg"].append("Invalid option for task status: <b>%s</b>.  Valid options are <b>All/Open/Closed</b>" %taskStatus)
+
+	# The list filters are kept in lower case with an empty list for all
+	taskPriorities = [priority.strip().lower() for priority in taskPriority.split(",")]
+	if taskPriorities == ["all"]:
+		reportOptions["taskPriority"] = []
+	elif all(priority in ["high", "medium", "low"] for priority in taskPriorities):
+		reportOptions["taskPriority"] = sorted(set(taskPriorities))
+	else:
+		reportOptions["errorMsg"].append("Invalid option for task priority: <b>%s</b>.  Valid options are <b>All</b> or a comma separated list of <b>High/Medium/Low</b>" %taskPriority)
+
+	taskTypes = [taskTypeName.strip().lower() for taskTypeName in taskType.split(",")]
+	if taskTypes == ["all"]:
+		reportOptions["taskType"] = []
+	elif all(taskTypes):
+		reportOptions["taskType"] = sorted(set(taskTypes))
+	else:
+		reportOptions["errorMsg"].append("Invalid option for task type: <b>%s</b>.  Valid options are <b>All</b> or a comma separated list of task types" %taskType)
+
+	taskOwners = [" ".join(ownerName.lower().split()) for ownerName in taskOwner.split(",")]
+	if taskOwners == ["all"]:
+		reportOptions["taskOwner"] = []
+	elif all(taskOwners):
+		reportOptions["taskOwner"] = sorted(set(taskOwners))
+	else:
+		reportOptions["errorMsg"].append("Invalid option for task owner: <b>%s</b>.  Valid options are <b>All</b> or a comma separated list of owner names" %taskOwner)
+
+	for dateOption, dateValue, dateLabel in [("createdFrom", createdFrom, "created from"), ("createdTo", createdTo, "created to")]:
+		try:
+			reportOptions[dateOption] = datetime.strptime(dateValue, "%Y-%m-%d").strftime("%Y-%m-%d") if dateValue else ""
+		except ValueError:
+			reportOptions["errorMsg"].append("Invalid option for task %s date: <b>%s</b>.  Valid options are empty or a date as <b>YYYY-MM-DD</b>" %(dateLabel, dateValue))
+
+	if reportOptions.get("createdFrom") and reportOptions.get("createdTo") and reportOptions["createdFrom"] > reportOptions["createdTo"]:
+		reportOptions["errorMsg"].append("The task created from date <b>%s</b> is after the created to date <b>%s</b>" %(createdFrom, createdTo))
     
 
 	if not reportOptions["errorMsg"]:
@@ -153,51 +375,86 @@ def verifyOptions(reportOptions):
 
 
 #---------------------------------------------------------------------#
-def create_report_zipfile(reportOutputs, reportName, projectName, projectID, numProjects, fileNameTimeStamp):
-	logger.info("Entering create_report_zipfile")
+def write_report_archive(uploadPipe, reportOutputs, reportName, projectName, projectID, numProjects, fileNameTimeStamp, compressionLevel):
+
+	try:
+		create_report_zipfile(reportOutputs, reportName, projectName, projectID, numProjects, fileNameTimeStamp, compressionLevel, uploadPipe)
+		uploadPipe.close()
+	except Exception as error:
+		logger.error("Unable to create report archive: %s" %error)
+		uploadPipe.abort(error)
+
+#---------------------------------------------------------------------#
+def report_upload_progress(bytesSent, chunkSize):
+
+	# Only report each time another interval of the archive has been sent
+	if (bytesSent - chunkSize) // uploadProgressInterval != bytesSent // uploadProgressInterval:
+		logger.debug("    Uploaded %s bytes" %bytesSent)
+		print("        Uploaded %.0f MB" %(bytesSent / (1024 * 1024)))
+
+#---------------------------------------------------------------------#
+def get_report_zipfile_name(reportName, projectName, projectID, numProjects, fileNameTimeStamp):
 
 	projectNameForFile = re.sub(r"[^a-zA-Z0-9]+", '-', projectName )
 
-	# create a ZipFile object
 	if numProjects <= 1 :
 		allFormatZipFile = projectNameForFile + "-" + projectID + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp + ".zip"
 	else: 
 		allFormatZipFile = projectNameForFile + "-with-children-"  + projectID + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp + ".zip"
 
-	# create a ZipFile object
-	allFormatsZip = zipfile.ZipFile(allFormatZipFile, 'w', zipfile.ZIP_DEFLATED)
+	return allFormatZipFile
 
+#---------------------------------------------------------------------#
+def create_report_zipfile(reportOutputs, reportName, projectName, projectID, numProjects, fileNameTimeStamp, compressionLevel=defaultCompressionLevel, upload_ptr=None):
+	logger.info("Entering create_report_zipfile")
 
-	logger.debug("    Create downloadable archive: %s" %allFormatZipFile)
-	print("        Create downloadable archive: %s" %allFormatZipFile)
-	for format in reportOutputs["allFormats"]:
-		print("            Adding %s to zip" %format)
-		logger.debug("    Adding %s to zip" %format)
-		allFormatsZip.write(format)
+	allFormatZipFile = get_report_zipfile_name(reportName, projectName, projectID, numProjects, fileNameTimeStamp)
+	uploadZipflle = allFormatZipFile.replace(".zip", "_upload.zip")
 
-	allFormatsZip.close()
-	logger.debug(    "Downloadable archive created")
-	print("        Downloadable archive created")
+	# The upload archive is written to upload_ptr when one is given, such as a pipe to the upload
+	if upload_ptr is None:
+		upload_ptr = uploadZipflle
+
+	# The downloadable archive is built in a spooled buffer that only moves to a
+	# temporary file once it is large so it never needs its own file on disk
+	with tempfile.SpooledTemporaryFile(max_size=archiveSpoolSize) as allFormatsBuffer:
+
+		logger.debug("    Create downloadable archive: %s" %allFormatZipFile)
+		print("        Create downloadable archive: %s" %allFormatZipFile)
+		with zipfile.ZipFile(allFormatsBuffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=compressionLevel) as allFormatsZip:
+			for format in reportOutputs["allFormats"]:
+				print("            Adding %s to zip" %format)
+				logger.debug("    Adding %s to zip" %format)
+				allFormatsZip.write(format)
+
+		logger.debug(    "Downloadable archive created")
+		print("        Downloadable archive created")
+
+		# Now create the zipfile for upload with the viewable file and the downloadable archive
+		print("        Create zip archive containing viewable and downloadable archive for upload: %s" %uploadZipflle)
+		logger.debug("    Create zip archive containing viewable and downloadable archive for upload: %s" %uploadZipflle)
+
+		allFormatsSize = allFormatsBuffer.tell()
+		allFormatsBuffer.seek(0)
+
+		with zipfile.ZipFile(upload_ptr, 'w', zipfile.ZIP_DEFLATED, compresslevel=compressionLevel) as zipToUpload:
+			zipToUpload.write(reportOutputs["viewable"])
+
+			# The pages of a report split across several pages are linked to from the viewable index page
+			for viewablePage in reportOutputs["viewablePages"]:
+				zipToUpload.write(viewablePage)
+
+			# The archive is already compressed so it is stored as is rather than compressed again
+			archiveInfo = zipfile.ZipInfo(allFormatZipFile, date_time=datetime.now().timetuple()[:6])
+			archiveInfo.compress_type = zipfile.ZIP_STORED
+			archiveInfo.external_attr = 0o644 << 16
+			with zipToUpload.open(archiveInfo, 'w', force_zip64=allFormatsSize >= zipfile.ZIP64_LIMIT) as archive_ptr:
+				shutil.copyfileobj(allFormatsBuffer, archive_ptr, archiveCopySize)
 
-	# Now create a temp zipfile of the zipfile along with the viewable file itself
-	uploadZipflle = allFormatZipFile.replace(".zip", "_upload.zip")
-	print("        Create zip archive containing viewable and downloadable archive for upload: %s" %uploadZipflle)
-	logger.debug("    Create zip archive containing viewable and downloadable archive for upload: %s" %uploadZipflle)
-	zipToUpload = zipfile.ZipFile(uploadZipflle, 'w', zipfile.ZIP_DEFLATED)
-	zipToUpload.write(reportOutputs["viewable"])
-	zipToUpload.write(allFormatZipFile)
-	zipToUpload.close()
 	logger.debug("    Archive zip file for upload has been created")
 	print("        Archive zip file for upload has been created")
 
 	# Clean up the items that were added to the zipfile
-	try:
-		os.remove(allFormatZipFile)
-	except OSError:
-		logger.error("Error removing %s" %allFormatZipFile)
-		print("Error removing %s" %allFormatZipFile)
-		return -1
-
 	for fileName in reportOutputs["allFormats"]:
 		try:
 			os.remove(fileName)
@@ -213,4 +470,8 @@ def create_report_zipfile(reportOutputs, reportName, projectName, projectID, num
 
 #----------------------------------------------------------------------#    
 if __name__ == "__main__":
-    main()  
\ No newline at end of file
+    try:
+        main()
+    finally:
+        # Keep the profile of a run that failed part way through
+        report_profile.stop_profiling()  
\ No newline at end of file
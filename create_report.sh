@@ -15,4 +15,22 @@ reportOptions=$4
 
 REPORTDIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" >/dev/null 2>&1 && pwd )"
 
+###############################################################################
+#  Hand the report to the report worker if one is running (see report_worker.py)
+#  and otherwise create the report in a new python process as before.  Only
+#  start the submit process when the worker's socket exists so reports on
+#  servers without a worker do not pay for an extra python startup.
+###############################################################################
+socketPath="${PROJECT_TASK_REPORT_SOCKET:-${REPORTDIR}/_project_task_report.sock}"
+
+if [ -S "$socketPath" ]; then
+    python3 ${REPORTDIR}/report_worker.py submit -pid $projectId -rid $reportId -authToken $authToken -reportOpts "$reportOptions"
+    workerStatus=$?
+
+    # 75 - the worker is not running or stopped before finishing the report
+    if [ $workerStatus -ne 75 ]; then
+        exit $workerStatus
+    fi
+fi
+
 python3 ${REPORTDIR}/create_report.py -pid $projectId -rid $reportId -authToken $authToken -reportOpts "$reportOptions"
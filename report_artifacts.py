@@ -9,15 +9,37 @@ File : report_artifacts.py
 '''
 
 import logging
-import os
 from datetime import datetime
-import base64
 import re
-#import xlsxwriter
+import json
+import html
+import itertools
+import csv
+import os
+import pickle
+import multiprocessing
+import concurrent.futures
+import xlsxwriter
+
+import report_assets
+import report_metrics
+import report_logging
 
 
 logger = logging.getLogger(__name__)
 
+parallelRenderingMinTasks = 20000  # Fewer tasks are written faster in one pass than by starting render processes
+maxSummaryRows = 25  # Rows shown for each rollup in the html report.  The exports include every row
+summaryChartDimensions = ["status", "priority", "taskType", "age"]  # Rollups charted in the xlsx summary
+
+summaryTitles = {}
+summaryTitles["project"] = "PROJECT"
+summaryTitles["owner"] = "TASK OWNER"
+summaryTitles["status"] = "TASK STATUS"
+summaryTitles["priority"] = "TASK PRIORITY"
+summaryTitles["taskType"] = "TASK TYPE"
+summaryTitles["age"] = "TASK AGE"
+
 #--------------------------------------------------------------------------------#
 def create_report_artifacts(reportData):
     logger.info("Entering create_report_artifacts")
@@ -25,118 +47,135 @@ def create_report_artifacts(reportData):
     # Dict to hold the complete list of reports
     reports = {}
 
-    htmlFile = generate_html_report(reportData)
-    #xlsxFile = generate_xlsx_report(reportData)
+    exportFormats = ["xlsx"] + reportData["reportOptions"]["dataExports"]
+    numRenderProcesses = get_render_processes(reportData, len(exportFormats))
+
+    if numRenderProcesses:
+        htmlFile, shardFiles, exportFiles = render_report_in_parallel(reportData, exportFormats, numRenderProcesses)
+    else:
+        # The other formats are written as the html report pulls each task so the
+        # task data is only walked once, which streamed task data requires
+        rowWriters = [reportWriters[exportFormat](reportData) for exportFormat in exportFormats]
+        reportTasks = write_report_rows(iterate_report_tasks(reportData), rowWriters)
+
+        htmlFile, shardFiles = generate_html_pages(reportData, reportTasks)
+        exportFiles = [rowWriter.close() for rowWriter in rowWriters]
+
+    # Every task has been seen by now so the rollups are complete
+    exportFiles += write_summary_exports(reportData)
 
     reports["viewable"] = htmlFile
-    reports["allFormats"] = [htmlFile]
+    reports["viewablePages"] = shardFiles  # Opened from the viewable index page so they are uploaded alongside it
+    reports["allFormats"] = [htmlFile] + shardFiles + exportFiles
 
     logger.info("Exiting create_report_artifacts")
     
     return reports 
 
+#------------------------------------------------------------------#
+def generate_html_pages(reportData, reportTasks=None):
+
+    if reportData["reportOptions"]["reportShardSize"]:
+        return generate_sharded_html_report(reportData, reportTasks)
 
+    return generate_html_report(reportData, reportTasks=reportTasks), []
 
 #------------------------------------------------------------------#
-def generate_html_report(reportData):
-    logger.info("    Entering generate_html_report")
+def get_render_processes(reportData, numExports):
 
-    reportName = reportData["reportName"]
-    projectName = reportData["projectName"] 
-    projectID = reportData["projectID"] 
-    fileNameTimeStamp = reportData["fileNameTimeStamp"] 
-    projectList = reportData["projectList"]
-    projectData = reportData["projectData"]
+    # Streamed task data can only be walked once so it is always written in a single pass
+    if reportData["taskStream"] is not None:
+        return 0
 
-    scriptDirectory = os.path.dirname(os.path.realpath(__file__))
-    cssFile =  os.path.join(scriptDirectory, "html-assets/css/revenera_common.css")
-    logoImageFile =  os.path.join(scriptDirectory, "html-assets/images/logo_reversed.svg")
-    iconFile =  os.path.join(scriptDirectory, "html-assets/images/favicon-revenera.ico")
+    numTasks = sum(len(reportData["projectData"][project["projectName"]]["projectTaskData"]) for project in reportData["projectList"])
+    if numTasks < parallelRenderingMinTasks:
+        return 0
 
-    logger.debug("cssFile: %s" %cssFile)
+    # The html report is written by this process while the exports are written by the others
+    return max(0, min(numExports, (os.cpu_count() or 1) - 1))
 
-    # Grab the current date/time for report date stamp
-    now = datetime.now().strftime("%B %d, %Y at %H:%M:%S")
+#------------------------------------------------------------------#
+def render_report_in_parallel(reportData, exportFormats, numRenderProcesses):
+    logger.info("    Entering render_report_in_parallel")
 
+    # Each export process works from its own copy of this snapshot so no
+    # format can change the data another format is writing
+    reportSnapshot = pickle.dumps(reportData, protocol=pickle.HIGHEST_PROTOCOL)
 
-    #########################################################
-    #  Encode the image files
-    encodedLogoImage = encodeImage(logoImageFile)
-    encodedfaviconImage = encodeImage(iconFile)
+    logger.debug("    Rendering %s exports in %s processes from a %s byte snapshot" %(len(exportFormats), numRenderProcesses, len(reportSnapshot)))
 
-    projectNameForFile = re.sub(r"[^a-zA-Z0-9]+", '-', projectName )
+    processContext = multiprocessing.get_context("spawn")
+    logQueue = processContext.Queue()
+    processListener = report_logging.receive_process_logging(logQueue)
 
-    if len(projectList)==1:
-        htmlFile = projectNameForFile + "-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp + ".html"
-    else:
-        htmlFile = projectNameForFile + "-with-children-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp + ".html" 
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=numRenderProcesses, mp_context=processContext, initializer=report_logging.forward_logging, initargs=(logQueue, report_logging.activeLogLevel)) as executor:
+            exportRenders = [executor.submit(render_report_export, exportFormat, reportSnapshot) for exportFormat in exportFormats]
 
-    logger.debug("htmlFile: %s" %htmlFile)
+            htmlFile, shardFiles = generate_html_pages(reportData)
 
-    #---------------------------------------------------------------------------------------------------
-    # Create a simple HTML file to display
-    #---------------------------------------------------------------------------------------------------
-    try:
-        html_ptr = open(htmlFile,"w")
-    except:
-        logger.error("Failed to open htmlfile %s:" %htmlFile)
-        raise
+            exportFiles = [exportRender.result() for exportRender in exportRenders]
+    finally:
+        processListener.stop()
 
-    html_ptr.write("<html>\n") 
-    html_ptr.write("    <head>\n")
+    numTasks = sum(len(reportData["projectData"][project["projectName"]]["projectTaskData"]) for project in reportData["projectList"])
+    report_metrics.add_count("tasks", numTasks)
+    report_metrics.add_count("rows", numTasks * (len(exportFormats) + 1))
 
-    html_ptr.write("        <!-- Required meta tags --> \n")
-    html_ptr.write("        <meta charset='utf-8'>  \n")
-    html_ptr.write("        <meta name='viewport' content='width=device-width, initial-scale=1, shrink-to-fit=no'> \n")
+    logger.info("    Exiting render_report_in_parallel")
+    return htmlFile, shardFiles, exportFiles
 
-    html_ptr.write(''' 
-        <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.5.1/css/bootstrap.min.css" integrity="sha384-VCmXjywReHh4PwowAiWNagnWcLhlEJLA5buUprzK8rxFgeH0kww/aWY76TfkUoSX" crossorigin="anonymous">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/twitter-bootstrap/4.1.3/css/bootstrap.css">
-        <link rel="stylesheet" href="https://cdn.datatables.net/1.10.21/css/dataTables.bootstrap4.min.css">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/jstree/3.2.1/themes/default/style.min.css">
-    ''')
+#------------------------------------------------------------------#
+def render_report_export(exportFormat, reportSnapshot):
+    # Run in a render process
+    reportData = pickle.loads(reportSnapshot)
 
+    rowWriter = reportWriters[exportFormat](reportData)
+    for project, task in iterate_report_tasks(reportData):
+        rowWriter.write_task(project, task)
 
-    html_ptr.write("        <style>\n")
+    return rowWriter.close()
 
-    # Add the contents of the css file to the head block
-    try:
-        f_ptr = open(cssFile)
-        logger.debug("Adding css file details")
-        for line in f_ptr:
-            html_ptr.write("            %s" %line)
-        f_ptr.close()
-    except:
-        logger.error("Unable to open %s" %cssFile)
-        print("Unable to open %s" %cssFile)
+#------------------------------------------------------------------#
+def generate_html_report(reportData, htmlFile=None, reportTasks=None, pageTitle=None, includeSummary=True):
+    logger.info("    Entering generate_html_report")
 
+    reportName = reportData["reportName"]
+    fileNameTimeStamp = reportData["fileNameTimeStamp"] 
+    projectList = reportData["projectList"]
+    taskTableFormat = reportData["reportOptions"]["taskTableFormat"]
 
-    html_ptr.write("        </style>\n")  
+    # A page of a sharded report only contains the tasks it is given
+    if htmlFile is None:
+        htmlFile = get_report_file_name(reportData, ".html")
+    if reportTasks is None:
+        reportTasks = iterate_report_tasks(reportData)
 
-    html_ptr.write("    	<link rel='icon' type='image/png' href='data:image/png;base64, {}'>\n".format(encodedfaviconImage.decode('utf-8')))
-    html_ptr.write("        <title>%s</title>\n" %(reportName.upper()))
-    html_ptr.write("    </head>\n") 
+    # Grab the current date/time for report date stamp
+    now = datetime.now().strftime("%B %d, %Y at %H:%M:%S")
 
-    html_ptr.write("<body>\n")
-    html_ptr.write("<div class=\"container-fluid\">\n")
+    logger.debug("htmlFile: %s" %htmlFile)
 
     #---------------------------------------------------------------------------------------------------
-    # Report Header
+    # Create a simple HTML file to display
     #---------------------------------------------------------------------------------------------------
-    html_ptr.write("<!-- BEGIN HEADER -->\n")
-    html_ptr.write("<div class='header'>\n")
-    html_ptr.write("  <div class='logo'>\n")
-    html_ptr.write("    <img src='data:image/svg+xml;base64,{}' style='width: 400px;'>\n".format(encodedLogoImage.decode('utf-8')))
-    html_ptr.write("  </div>\n")
-    html_ptr.write("<div class='report-title'>%s</div>\n" %reportName)
-    html_ptr.write("</div>\n")
-    html_ptr.write("<!-- END HEADER -->\n")
+    try:
+        html_ptr = open(htmlFile,"w")
+    except:
+        logger.error("Failed to open htmlfile %s:" %htmlFile)
+        raise
+
+    if pageTitle is None:
+        write_html_header(html_ptr, reportName)
+    else:
+        write_html_header(html_ptr, reportName + " - " + pageTitle)
 
     #---------------------------------------------------------------------------------------------------
     # Body of Report
     #---------------------------------------------------------------------------------------------------
     html_ptr.write("<!-- BEGIN BODY -->\n")  
 
+    write_html_stale_notice(html_ptr, reportData)
 
     html_ptr.write("<table id='taskData' class='table table-hover table-sm row-border' style='width:90%'>\n")
 
@@ -163,53 +202,56 @@ def generate_html_report(reportData):
 
 
 
-    for project in projectList:
-
-        projectName = project["projectName"]
-        projectLink = project["projectLink"]
-        inventoryLinkBase = project["inventoryLinkBase"]
-
-        taskData = projectData[projectName]["projectTaskData"]
+    if taskTableFormat == "json":
+        # DataTables builds the rows from the task data written after the table
+        logger.debug("Writing task data as json")
+    else:
+        for project, task in reportTasks:
 
-        for task in taskData:
+            projectName = project["projectName"]
+            projectLink = project["projectLink"]
+            inventoryLinkBase = project["inventoryLinkBase"]
 
-            inventoryItemId = task["inventoryId"]
+            inventoryItemId = task.inventoryId
             inventoryItemLink = inventoryLinkBase + str(inventoryItemId)
-            taskType = task["taskType"]
-            priority = task["priority"]
-            createdDate = task["createdDate"]
-            summary = task["summary"]
-            taskStatus = task["taskStatus"]
-            almIssues = task["almIssues"]
+            taskType = task.taskType
+            priority = task.priority
+            createdDate = task.createdDate
+            summary = task.summary
+            taskStatus = task.taskStatus
+            almIssues = task.almIssues
 
 
             html_ptr.write("        <tr> \n")
             if len(projectList) > 1:
                 html_ptr.write("            <td class='text-left'><a href='%s' target='_blank'>%s</a></td>\n" %(projectLink, projectName))
             html_ptr.write("            <td class='text-left'><a href='%s' target='_blank'>%s</a></td>\n" %(inventoryItemLink, summary))
-            html_ptr.write("            <td class='text-left'>%s</td>\n" %(task["taskOwner"]))
-            html_ptr.write("            <td class='text-left'>%s</td>\n" %(task["taskCreator"]))
+            html_ptr.write("            <td class='text-left'>%s</td>\n" %(task.taskOwner))
+            html_ptr.write("            <td class='text-left'>%s</td>\n" %(task.taskCreator))
             html_ptr.write("            <td class='text-left'>%s</td>\n" %(taskType))
             html_ptr.write("            <td class='text-left'>%s</td>\n" %(priority))
             html_ptr.write("            <td class='text-left'>%s</td>\n" %(taskStatus))
             html_ptr.write("            <td class='text-left'>%s</td>\n" %(createdDate))
 
             html_ptr.write("            <td class='text-left'>")
-            
-            for issue in almIssues:
-                 html_ptr.write(" <a href='%s' target='_blank'>%s</a><br>\n" %(issue["externalUrl"], issue["externalKey"])  )
-
-            html_ptr.write(" </td\n>")
+        
+            for externalUrl, externalKey in almIssues:
+                 html_ptr.write(" <a href='%s' target='_blank'>%s</a><br>\n" %(externalUrl, externalKey)  )
 
+            html_ptr.write(" </td>\n")
+            html_ptr.write("        </tr>\n") 
 
-
-
-        html_ptr.write("        </tr>\n") 
     html_ptr.write("    </tbody>\n")
 
 
     html_ptr.write("</table>\n") 
 
+    if taskTableFormat == "json":
+        write_task_data_json(html_ptr, reportTasks)
+
+    # Written after the tasks since streamed tasks are only counted as they are written
+    if includeSummary:
+        write_html_task_summary(html_ptr, reportData)
 
 
 
@@ -218,12 +260,7 @@ def generate_html_report(reportData):
     #---------------------------------------------------------------------------------------------------
     # Report Footer
     #---------------------------------------------------------------------------------------------------
-    html_ptr.write("<!-- BEGIN FOOTER -->\n")
-    html_ptr.write("<div class='report-footer'>\n")
-    html_ptr.write("  <div style='float:left'>&copy; %s Flexera</div>\n" %fileNameTimeStamp[0:4])
-    html_ptr.write("  <div style='float:right'>Generated on %s</div>\n" %now)
-    html_ptr.write("</div>\n")
-    html_ptr.write("<!-- END FOOTER -->\n")   
+    write_html_footer(html_ptr, fileNameTimeStamp, now)
 
     html_ptr.write("</div>\n")
 
@@ -242,7 +279,62 @@ def generate_html_report(reportData):
     ''')
 
     html_ptr.write("<script>\n")
-    html_ptr.write('''
+
+    if taskTableFormat == "json":
+        html_ptr.write('''
+
+            function escapeHtml(text) {
+                return String(text).replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;").replace(/'/g, "&#39;").replace(/"/g, "&quot;");
+            }
+
+            // Render a value from one of the dictionaries, escaped when the cell is displayed since the values come from the server
+            function dictionaryColumn(dictionary, index) {
+                return {"render": function (data, type, row) {
+                    var value = taskDictionaries[dictionary][row[index]];
+                    return type === "display" ? escapeHtml(value) : value;
+                }};
+            }
+
+            var taskColumns = [];
+        ''')
+
+        if len(projectList) > 1:
+            html_ptr.write('''
+            taskColumns.push({"render": function (data, type, row) {
+                var project = taskDictionaries.project[row[0]];
+                return type === "display" ? "<a href='" + escapeHtml(project[1]) + "' target='_blank'>" + escapeHtml(project[0]) + "</a>" : project[0];
+            }});
+            ''')
+
+        html_ptr.write('''
+            taskColumns.push({"render": function (data, type, row) {
+                var project = taskDictionaries.project[row[0]];
+                return type === "display" ? "<a href='" + escapeHtml(project[2] + row[1]) + "' target='_blank'>" + escapeHtml(row[2]) + "</a>" : row[2];
+            }});
+            taskColumns.push(dictionaryColumn("user", 3));
+            taskColumns.push(dictionaryColumn("user", 4));
+            taskColumns.push(dictionaryColumn("taskType", 5));
+            taskColumns.push(dictionaryColumn("priority", 6));
+            taskColumns.push(dictionaryColumn("taskStatus", 7));
+            taskColumns.push({"data": 8, "render": function (data, type, row) { return type === "display" ? escapeHtml(data) : data; }});
+            taskColumns.push({"render": function (data, type, row) {
+                return row[9].map(function (issue) {
+                    return type === "display" ? " <a href='" + escapeHtml(issue[0]) + "' target='_blank'>" + escapeHtml(issue[1]) + "</a><br>" : issue[1];
+                }).join(" ");
+            }});
+
+            $(document).ready(function (){
+                var table = $('#taskData').DataTable({
+                    "data": taskRows,
+                    "columns": taskColumns,
+                    "deferRender": true,
+                    "order": [[ 2, "desc" ]],
+                    "lengthMenu": [ [25, 50, 100, -1], [25, 50, 100, "All"] ],
+                });
+            });
+        ''')
+    else:
+        html_ptr.write('''
 
             $(document).ready(function (){
                 var table = $('#taskData').DataTable({
@@ -262,16 +354,606 @@ def generate_html_report(reportData):
     return htmlFile
 
 
-####################################################################
-def encodeImage(imageFile):
+#------------------------------------------------------------------#
+def get_summary_dimensions(reportData):
+
+    # A project rollup only adds something when there are child projects
+    if len(reportData["projectList"]) > 1:
+        return reportData["taskSummary"].summaryDimensions
+
+    return [summaryDimension for summaryDimension in reportData["taskSummary"].summaryDimensions if summaryDimension != "project"]
+
+#------------------------------------------------------------------#
+def write_html_stale_notice(html_ptr, reportData):
+
+    # Projects whose tasks could not be synced are reported from the last stored snapshot
+    staleProjects = reportData["staleProjects"]
+    if staleProjects:
+        html_ptr.write("<div class='alert alert-warning' style='width:90%%'>The tasks for %s could not be updated from Code Insight and are shown as they were last synced.</div>\n" %html.escape(", ".join(staleProjects)))
+
+#------------------------------------------------------------------#
+def write_html_task_summary(html_ptr, reportData):
+    logger.info("    Entering write_html_task_summary")
+
+    taskSummary = reportData["taskSummary"]
+
+    html_ptr.write("<h4 class='text-center'>Task Summary</h4>\n")
+    html_ptr.write("<div class='row' id='taskSummary'>\n")
+
+    for summaryDimension in get_summary_dimensions(reportData):
+        rollupRows = taskSummary.get_rollup(summaryDimension)
+
+        # Anything past the rows shown is combined into a single row
+        if len(rollupRows) > maxSummaryRows:
+            otherRows = rollupRows[maxSummaryRows - 1:]
+            otherRow = ["%s others" %len(otherRows)] + [sum(otherRow[column] for otherRow in otherRows) for column in [1, 2, 3]]
+            rollupRows = rollupRows[:maxSummaryRows - 1] + [otherRow]
+
+        html_ptr.write("  <div class='col-lg-4 col-md-6'>\n")
+        html_ptr.write("    <table class='table table-sm'>\n")
+        html_ptr.write("        <thead>\n")
+        html_ptr.write("            <tr>\n")
+        html_ptr.write("                <th style='width: 40%%'>%s</th>\n" %summaryTitles[summaryDimension])
+        html_ptr.write("                <th style='width: 10%' class='text-right'>TASKS</th>\n")
+        html_ptr.write("                <th style='width: 10%' class='text-right'>OPEN</th>\n")
+        html_ptr.write("                <th style='width: 10%' class='text-right'>CLOSED</th>\n")
+        html_ptr.write("                <th style='width: 30%'></th>\n")
+        html_ptr.write("            </tr>\n")
+        html_ptr.write("        </thead>\n")
+        html_ptr.write("        <tbody>\n")
+
+        for value, numTasks, numOpen, numClosed in rollupRows:
+            # The bar shows the share of all tasks with the open tasks in the darker colour
+            openWidth = 100.0 * numOpen / max(1, taskSummary.numTasks)
+            closedWidth = 100.0 * numClosed / max(1, taskSummary.numTasks)
+
+            html_ptr.write("            <tr>\n")
+            html_ptr.write("                <td class='text-left'>%s</td>\n" %html.escape(str(value)))
+            html_ptr.write("                <td class='text-right'>%s</td>\n" %numTasks)
+            html_ptr.write("                <td class='text-right'>%s</td>\n" %numOpen)
+            html_ptr.write("                <td class='text-right'>%s</td>\n" %numClosed)
+            html_ptr.write("                <td><div class='progress'><div class='progress-bar' style='width: %.1f%%'></div><div class='progress-bar bg-secondary' style='width: %.1f%%'></div></div></td>\n" %(openWidth, closedWidth))
+            html_ptr.write("            </tr>\n")
+
+        html_ptr.write("        </tbody>\n")
+        html_ptr.write("    </table>\n")
+        html_ptr.write("  </div>\n")
+
+    html_ptr.write("</div>\n")
+
+    logger.info("    Exiting write_html_task_summary")
+
+#------------------------------------------------------------------#
+def write_summary_exports(reportData):
+
+    summaryFiles = []
+    dataExports = reportData["reportOptions"]["dataExports"]
+    taskSummary = reportData["taskSummary"]
+
+    # The rollups are written next to each export in the same format, one row per value
+    summaryRows = []
+    for summaryDimension in get_summary_dimensions(reportData):
+        for value, numTasks, numOpen, numClosed in taskSummary.get_rollup(summaryDimension):
+            summaryRows.append({"dimension" : summaryDimension, "value" : value, "tasks" : numTasks, "open" : numOpen, "closed" : numClosed})
+
+    if "csv" in dataExports:
+        summaryFile = get_report_file_name(reportData, "-summary.csv")
+        with open(summaryFile, "w", newline="", encoding="utf-8") as summary_ptr:
+            csvWriter = csv.DictWriter(summary_ptr, fieldnames=["dimension", "value", "tasks", "open", "closed"])
+            csvWriter.writeheader()
+            csvWriter.writerows(summaryRows)
+        summaryFiles.append(summaryFile)
+
+    if "jsonl" in dataExports:
+        summaryFile = get_report_file_name(reportData, "-summary.jsonl")
+        with open(summaryFile, "w", encoding="utf-8") as summary_ptr:
+            for summaryRow in summaryRows:
+                summary_ptr.write(json.dumps(summaryRow, separators=(",", ":")) + "\n")
+        summaryFiles.append(summaryFile)
+
+    return summaryFiles
+
+#------------------------------------------------------------------#
+def get_report_file_name(reportData, fileExtension):
+
+    reportName = reportData["reportName"]
+    projectName = reportData["projectName"] 
+    projectID = reportData["projectID"] 
+    fileNameTimeStamp = reportData["fileNameTimeStamp"] 
+    projectList = reportData["projectList"]
+
+    projectNameForFile = re.sub(r"[^a-zA-Z0-9]+", '-', projectName )
+
+    if len(projectList)==1:
+        reportFile = projectNameForFile + "-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp + fileExtension
+    else:
+        reportFile = projectNameForFile + "-with-children-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp + fileExtension
+
+    return reportFile
+
+#------------------------------------------------------------------#
+def write_html_header(html_ptr, reportTitle):
+
+    # The minified css and encoded images are prepared once and cached
+    brandingAssets = report_assets.get_branding_assets()
+
+    html_ptr.write("<html>\n") 
+    html_ptr.write("    <head>\n")
+
+    html_ptr.write("        <!-- Required meta tags --> \n")
+    html_ptr.write("        <meta charset='utf-8'>  \n")
+    html_ptr.write("        <meta name='viewport' content='width=device-width, initial-scale=1, shrink-to-fit=no'> \n")
+
+    html_ptr.write(''' 
+        <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.5.1/css/bootstrap.min.css" integrity="sha384-VCmXjywReHh4PwowAiWNagnWcLhlEJLA5buUprzK8rxFgeH0kww/aWY76TfkUoSX" crossorigin="anonymous">
+        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/twitter-bootstrap/4.1.3/css/bootstrap.css">
+        <link rel="stylesheet" href="https://cdn.datatables.net/1.10.21/css/dataTables.bootstrap4.min.css">
+        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/jstree/3.2.1/themes/default/style.min.css">
+    ''')
+
+
+    html_ptr.write("        <style>%s</style>\n" %brandingAssets["css"])
+    html_ptr.write("    	<link rel='icon' type='image/png' href='data:image/png;base64, {}'>\n".format(brandingAssets["favicon"]))
+    html_ptr.write("        <title>%s</title>\n" %(reportTitle.upper()))
+    html_ptr.write("    </head>\n") 
+
+    html_ptr.write("<body>\n")
+    html_ptr.write("<div class=\"container-fluid\">\n")
+
+    #---------------------------------------------------------------------------------------------------
+    # Report Header
+    #---------------------------------------------------------------------------------------------------
+    html_ptr.write("<!-- BEGIN HEADER -->\n")
+    html_ptr.write("<div class='header'>\n")
+    html_ptr.write("  <div class='logo'>\n")
+    html_ptr.write("    <img src='data:image/svg+xml;base64,{}' style='width: 400px;'>\n".format(brandingAssets["logo"]))
+    html_ptr.write("  </div>\n")
+    html_ptr.write("<div class='report-title'>%s</div>\n" %reportTitle)
+    html_ptr.write("</div>\n")
+    html_ptr.write("<!-- END HEADER -->\n")
+
+#------------------------------------------------------------------#
+def write_html_footer(html_ptr, fileNameTimeStamp, now):
+
+    html_ptr.write("<!-- BEGIN FOOTER -->\n")
+    html_ptr.write("<div class='report-footer'>\n")
+    html_ptr.write("  <div style='float:left'>&copy; %s Flexera</div>\n" %fileNameTimeStamp[0:4])
+    html_ptr.write("  <div style='float:right'>Generated on %s</div>\n" %now)
+    html_ptr.write("</div>\n")
+    html_ptr.write("<!-- END FOOTER -->\n")   
+
+#------------------------------------------------------------------#
+def generate_sharded_html_report(reportData, reportTasks=None):
+    logger.info("    Entering generate_sharded_html_report")
+
+    reportShardSize = reportData["reportOptions"]["reportShardSize"]
+    htmlFile = get_report_file_name(reportData, ".html")
+    shardFileBase = htmlFile[:-len(".html")]
+
+    # groupby pulls tasks lazily so streamed task data is still written as it arrives
+    if reportShardSize == "project":
+        shardKey = lambda projectTask: projectTask[0]["projectID"]
+    else:
+        taskCounter = itertools.count()
+        shardKey = lambda projectTask: next(taskCounter) // reportShardSize
+
+    shardDetails = []
+
+    if reportTasks is None:
+        reportTasks = iterate_report_tasks(reportData)
+
+    for shardNumber, (_, shardTasks) in enumerate(itertools.groupby(reportTasks, key=shardKey), start=1):
+        shardFile = "%s-page-%04d.html" %(shardFileBase, shardNumber)
+
+        shardSummary = {}
+        shardSummary["shardFile"] = shardFile
+        shardSummary["projectNames"] = []
+        shardSummary["numTasks"] = 0
+        shardDetails.append(shardSummary)
+
+        generate_html_report(reportData, shardFile, summarize_shard_tasks(shardTasks, shardSummary), "Page %s" %shardNumber, includeSummary=False)
+
+    logger.debug("    Report split into %s pages" %len(shardDetails))
+    print("        Report split into %s pages" %len(shardDetails))
+
+    generate_html_index(reportData, htmlFile, shardDetails)
+
+    logger.info("    Exiting generate_sharded_html_report")
+    return htmlFile, [shardSummary["shardFile"] for shardSummary in shardDetails]
+
+#------------------------------------------------------------------#
+def summarize_shard_tasks(shardTasks, shardSummary):
+
+    for project, task in shardTasks:
+        if not shardSummary["projectNames"] or shardSummary["projectNames"][-1] != project["projectName"]:
+            shardSummary["projectNames"].append(project["projectName"])
+        shardSummary["numTasks"] += 1
+
+        yield project, task
+
+#------------------------------------------------------------------#
+def generate_html_index(reportData, htmlFile, shardDetails):
+    logger.info("    Entering generate_html_index")
+
+    reportName = reportData["reportName"]
+    fileNameTimeStamp = reportData["fileNameTimeStamp"] 
+
+    now = datetime.now().strftime("%B %d, %Y at %H:%M:%S")
 
-    #############################################
-    # Create base64 variable for branding image
     try:
-        with open(imageFile,"rb") as image:
-            logger.debug("Encoding image: %s" %imageFile)
-            encodedImage = base64.b64encode(image.read())
-            return encodedImage
+        html_ptr = open(htmlFile,"w")
     except:
-        logger.error("Unable to open %s" %imageFile)
-        raise
\ No newline at end of file
+        logger.error("Failed to open htmlfile %s:" %htmlFile)
+        raise
+
+    write_html_header(html_ptr, reportName)
+
+    html_ptr.write("<!-- BEGIN BODY -->\n")
+    write_html_stale_notice(html_ptr, reportData)
+    html_ptr.write("<p class='lead'>The %s tasks in this report have been split across %s pages.  Select a page below to open it.</p>\n" %(sum(shardSummary["numTasks"] for shardSummary in shardDetails), len(shardDetails)))
+
+    html_ptr.write("<table id='taskPages' class='table table-hover table-sm row-border' style='width:90%'>\n")
+    html_ptr.write("    <thead>\n")
+    html_ptr.write("        <tr>\n")
+    html_ptr.write("            <th style='width: 10%' class='text-center'>PAGE</th>\n")
+    html_ptr.write("            <th style='width: 70%' class='text-center'>PROJECTS</th>\n")
+    html_ptr.write("            <th style='width: 20%' class='text-center'>TASKS</th>\n")
+    html_ptr.write("        </tr>\n")
+    html_ptr.write("    </thead>\n")
+    html_ptr.write("    <tbody>\n")
+
+    for shardNumber, shardSummary in enumerate(shardDetails, start=1):
+        projectNames = shardSummary["projectNames"]
+        if len(projectNames) > 2:
+            projectSummary = "%s ... %s (%s projects)" %(html.escape(projectNames[0]), html.escape(projectNames[-1]), len(projectNames))
+        else:
+            projectSummary = html.escape(", ".join(projectNames))
+
+        html_ptr.write("        <tr>\n")
+        html_ptr.write("            <td class='text-center'><a class='task-page' href='%s'>Page %s</a></td>\n" %(shardSummary["shardFile"], shardNumber))
+        html_ptr.write("            <td class='text-left'>%s</td>\n" %projectSummary)
+        html_ptr.write("            <td class='text-center'>%s</td>\n" %shardSummary["numTasks"])
+        html_ptr.write("        </tr>\n")
+
+    html_ptr.write("    </tbody>\n")
+    html_ptr.write("</table>\n")
+
+    write_html_task_summary(html_ptr, reportData)
+
+    # Pages are only loaded into the frame when selected
+    html_ptr.write("<iframe id='taskPage' style='width:100%; height:80vh; border:0'></iframe>\n")
+    html_ptr.write("<!-- END BODY -->\n")
+
+    write_html_footer(html_ptr, fileNameTimeStamp, now)
+
+    html_ptr.write("</div>\n")
+
+    html_ptr.write('''
+    <script>
+        document.querySelectorAll("a.task-page").forEach(function (pageLink) {
+            pageLink.addEventListener("click", function (event) {
+                event.preventDefault();
+                document.getElementById("taskPage").src = pageLink.getAttribute("href");
+            });
+        });
+    </script>
+    ''')
+
+    html_ptr.write("</body>\n") 
+    html_ptr.write("</html>\n") 
+    html_ptr.close() 
+
+    logger.info("    Exiting generate_html_index")
+
+#------------------------------------------------------------------#
+def generate_xlsx_report(reportData, reportTasks=None):
+    logger.info("    Entering generate_xlsx_report")
+
+    if reportTasks is None:
+        reportTasks = iterate_report_tasks(reportData)
+
+    xlsxWriter = XLSXReportWriter(reportData)
+    for project, task in reportTasks:
+        xlsxWriter.write_task(project, task)
+
+    logger.info("    Exiting generate_xlsx_report")
+    return xlsxWriter.close()
+
+#------------------------------------------------------------------#
+class XLSXReportWriter(object):
+    '''
+    Write the task table to a workbook one row at a time.  The workbook
+    is opened in constant_memory mode so each row is flushed to disk
+    once the next row starts and memory does not grow with the tasks.
+    '''
+
+    maxWorksheetRows = 1048576  # Excel limit including the header row
+    maxWorksheetURLs = 65530  # Excel limit for hyperlinks in a worksheet
+
+    def __init__(self, reportData):
+        self.xlsxFile = get_report_file_name(reportData, ".xlsx")
+        self.includeProjectColumn = len(reportData["projectList"]) > 1
+
+        logger.debug("xlsxFile: %s" %self.xlsxFile)
+
+        self.workbook = xlsxwriter.Workbook(self.xlsxFile, {"constant_memory" : True, "strings_to_urls" : False})
+        self.headerFormat = self.workbook.add_format({"bold" : True, "bg_color" : "#D9D9D9", "border" : 1})
+        self.dateFormat = self.workbook.add_format({"num_format" : "yyyy-mm-dd"})
+        self.linkFormat = self.workbook.get_default_url_format()
+
+        self.columnHeaders = ["TASK SUMMARY", "TASK OWNER", "TASK CREATOR", "TASK TYPE", "TASK PRIORITY", "TASK STATUS", "CREATED DATE", "EXTERNAL ISSUES"]
+        self.columnWidths = [60, 25, 25, 15, 15, 15, 15, 30]
+        if self.includeProjectColumn:
+            self.columnHeaders.insert(0, "PROJECT")
+            self.columnWidths.insert(0, 30)
+
+        self.taskSummary = reportData["taskSummary"]
+        self.summaryDimensions = get_summary_dimensions(reportData)
+
+        self.worksheets = []
+        self.numTasks = 0
+        self.add_worksheet()
+
+    #---------------------------------------------------------------#
+    def add_worksheet(self):
+        # Very large reports continue on additional worksheets
+        if self.worksheets:
+            self.finish_worksheet()
+            self.worksheet = self.workbook.add_worksheet("Tasks %s" %(len(self.worksheets) + 1))
+        else:
+            self.worksheet = self.workbook.add_worksheet("Tasks")
+
+        self.worksheets.append(self.worksheet)
+        self.worksheet.freeze_panes(1, 0)
+
+        for column, (columnHeader, columnWidth) in enumerate(zip(self.columnHeaders, self.columnWidths)):
+            self.worksheet.set_column(column, column, columnWidth)
+            self.worksheet.write_string(0, column, columnHeader, self.headerFormat)
+
+        self.row = 1
+        self.numURLs = 0
+
+    #---------------------------------------------------------------#
+    def finish_worksheet(self):
+        self.worksheet.autofilter(0, 0, max(0, self.row - 1), len(self.columnHeaders) - 1)
+
+    #---------------------------------------------------------------#
+    def write_task(self, project, task):
+
+        if self.row == self.maxWorksheetRows:
+            self.add_worksheet()
+
+        column = 0
+
+        if self.includeProjectColumn:
+            self.write_link(column, project["projectLink"], project["projectName"])
+            column += 1
+
+        self.write_link(column, project["inventoryLinkBase"] + str(task.inventoryId), task.summary)
+
+        # write_string raises on None where the generic write left the cell empty
+        self.worksheet.write_string(self.row, column + 1, str(task.taskOwner or ""))
+        self.worksheet.write_string(self.row, column + 2, str(task.taskCreator or ""))
+        self.worksheet.write_string(self.row, column + 3, str(task.taskType or ""))
+        self.worksheet.write_string(self.row, column + 4, str(task.priority or ""))
+        self.worksheet.write_string(self.row, column + 5, str(task.taskStatus or ""))
+
+        createdDate = str(task.createdDate or "")
+        try:
+            self.worksheet.write_datetime(self.row, column + 6, datetime.strptime(createdDate, "%Y-%m-%d"), self.dateFormat)
+        except ValueError:
+            self.worksheet.write_string(self.row, column + 6, createdDate)
+
+        self.worksheet.write_string(self.row, column + 7, ", ".join(str(externalKey or "") for _, externalKey in task.almIssues))
+
+        self.row += 1
+        self.numTasks += 1
+
+    #---------------------------------------------------------------#
+    def write_link(self, column, url, text):
+        # Past the hyperlink limit the text is still written, just without the link
+        if self.numURLs < self.maxWorksheetURLs and len(url) <= 2079:
+            self.worksheet.write_url(self.row, column, url, self.linkFormat, str(text or ""))
+            self.numURLs += 1
+        else:
+            self.worksheet.write_string(self.row, column, str(text or ""))
+
+    #---------------------------------------------------------------#
+    def write_summary_worksheet(self):
+
+        # Written last since the rollups are only complete once every task has been written
+        summarySheet = self.workbook.add_worksheet("Summary")
+        summarySheet.set_column(0, 0, 40)
+        summarySheet.set_column(1, 3, 12)
+
+        row = 0
+        numCharts = 0
+
+        for summaryDimension in self.summaryDimensions:
+            summarySheet.write_string(row, 0, summaryTitles[summaryDimension], self.headerFormat)
+            summarySheet.write_string(row, 1, "TASKS", self.headerFormat)
+            summarySheet.write_string(row, 2, "OPEN", self.headerFormat)
+            summarySheet.write_string(row, 3, "CLOSED", self.headerFormat)
+
+            rollupRows = self.taskSummary.get_rollup(summaryDimension)
+            firstRow = row + 1
+
+            for rollupRow in rollupRows:
+                row += 1
+                summarySheet.write_string(row, 0, str(rollupRow[0]))
+                summarySheet.write_number(row, 1, rollupRow[1])
+                summarySheet.write_number(row, 2, rollupRow[2])
+                summarySheet.write_number(row, 3, rollupRow[3])
+
+            # Owners and projects can run to thousands of values so only the short rollups are charted
+            if summaryDimension in summaryChartDimensions and rollupRows:
+                summaryChart = self.workbook.add_chart({"type" : "column", "subtype" : "stacked"})
+                for column, seriesName in [(2, "Open"), (3, "Closed")]:
+                    summaryChart.add_series({"name" : seriesName, "categories" : ["Summary", firstRow, 0, row, 0], "values" : ["Summary", firstRow, column, row, column]})
+                summaryChart.set_title({"name" : summaryTitles[summaryDimension].title()})
+                summarySheet.insert_chart(numCharts * 16, 5, summaryChart)
+                numCharts += 1
+
+            row += 2
+
+    #---------------------------------------------------------------#
+    def close(self):
+        self.finish_worksheet()
+        self.write_summary_worksheet()
+        self.workbook.close()
+
+        logger.debug("    Wrote %s tasks across %s worksheets to %s" %(self.numTasks, len(self.worksheets), self.xlsxFile))
+        return self.xlsxFile
+
+#------------------------------------------------------------------#
+def get_export_row(project, task):
+
+    # A flat row with the same fields for the csv and json lines exports
+    exportRow = {}
+    exportRow["projectID"] = project["projectID"]
+    exportRow["projectName"] = project["projectName"]
+    exportRow["inventoryID"] = task.inventoryId
+    exportRow["summary"] = task.summary
+    exportRow["owner"] = task.taskOwner
+    exportRow["creator"] = task.taskCreator
+    exportRow["type"] = task.taskType
+    exportRow["priority"] = task.priority
+    exportRow["status"] = task.taskStatus
+    exportRow["createdDate"] = task.createdDate
+    exportRow["createdTime"] = task.createdTime
+    exportRow["inventoryLink"] = project["inventoryLinkBase"] + str(task.inventoryId)
+
+    return exportRow
+
+#------------------------------------------------------------------#
+class CSVReportWriter(object):
+    '''
+    Write the tasks to a csv file one row at a time for loading into
+    other tools.  External issues are written as a ; separated list.
+    '''
+
+    fieldNames = ["projectID", "projectName", "inventoryID", "summary", "owner", "creator", "type", "priority", "status", "createdDate", "createdTime", "inventoryLink", "externalIssues"]
+
+    def __init__(self, reportData):
+        self.csvFile = get_report_file_name(reportData, ".csv")
+        logger.debug("csvFile: %s" %self.csvFile)
+
+        self.csv_ptr = open(self.csvFile, "w", newline="", encoding="utf-8")
+        self.csvWriter = csv.DictWriter(self.csv_ptr, fieldnames=self.fieldNames)
+        self.csvWriter.writeheader()
+
+    #---------------------------------------------------------------#
+    def write_task(self, project, task):
+        exportRow = get_export_row(project, task)
+        exportRow["externalIssues"] = ";".join(str(externalKey or "") for _, externalKey in task.almIssues)
+        self.csvWriter.writerow(exportRow)
+
+    #---------------------------------------------------------------#
+    def close(self):
+        self.csv_ptr.close()
+        return self.csvFile
+
+#------------------------------------------------------------------#
+class JSONLinesReportWriter(object):
+    '''
+    Write each task as a json object on its own line.  External issues
+    are kept as a list of key and link pairs.
+    '''
+
+    def __init__(self, reportData):
+        self.jsonlFile = get_report_file_name(reportData, ".jsonl")
+        logger.debug("jsonlFile: %s" %self.jsonlFile)
+
+        self.jsonl_ptr = open(self.jsonlFile, "w", encoding="utf-8")
+
+    #---------------------------------------------------------------#
+    def write_task(self, project, task):
+        exportRow = get_export_row(project, task)
+        exportRow["externalIssues"] = [{"key" : externalKey, "link" : externalLink} for externalLink, externalKey in task.almIssues]
+        self.jsonl_ptr.write(json.dumps(exportRow, separators=(",", ":")) + "\n")
+
+    #---------------------------------------------------------------#
+    def close(self):
+        self.jsonl_ptr.close()
+        return self.jsonlFile
+
+#------------------------------------------------------------------#
+reportWriters = {}
+reportWriters["xlsx"] = XLSXReportWriter
+reportWriters["csv"] = CSVReportWriter
+reportWriters["jsonl"] = JSONLinesReportWriter
+
+#------------------------------------------------------------------#
+def write_report_rows(reportTasks, rowWriters):
+
+    numTasks = 0
+
+    # Pass each task to the other formats on its way to the html report
+    for project, task in reportTasks:
+        for rowWriter in rowWriters:
+            rowWriter.write_task(project, task)
+
+        numTasks += 1
+        yield project, task
+
+    report_metrics.add_count("tasks", numTasks)
+    report_metrics.add_count("rows", numTasks * (len(rowWriters) + 1))
+
+#------------------------------------------------------------------#
+def write_task_data_json(html_ptr, reportTasks):
+    logger.info("    Entering write_task_data_json")
+
+    # Values repeated across tasks are written once in a dictionary and referenced by index
+    dictionaryIndexes = {"project" : {}, "user" : {}, "taskType" : {}, "priority" : {}, "taskStatus" : {}}
+
+    def encode_value(dictionaryName, value):
+        dictionary = dictionaryIndexes[dictionaryName]
+        if value not in dictionary:
+            dictionary[value] = len(dictionary)
+        return dictionary[value]
+
+    html_ptr.write("<script>\n")
+    html_ptr.write("    var taskRows = [\n")
+
+    for project, task in reportTasks:
+        taskRow = []
+        taskRow.append(encode_value("project", (project["projectName"], project["projectLink"], project["inventoryLinkBase"])))
+        taskRow.append(task.inventoryId)
+        taskRow.append(task.summary)
+        taskRow.append(encode_value("user", task.taskOwner))
+        taskRow.append(encode_value("user", task.taskCreator))
+        taskRow.append(encode_value("taskType", task.taskType))
+        taskRow.append(encode_value("priority", task.priority))
+        taskRow.append(encode_value("taskStatus", task.taskStatus))
+        taskRow.append(task.createdDate)
+        taskRow.append(task.almIssues)
+
+        html_ptr.write(encode_json(taskRow) + ",\n")
+
+    html_ptr.write("    ];\n")
+
+    # Written after the rows so values first seen late in a stream are included
+    taskDictionaries = {dictionaryName : list(dictionary) for dictionaryName, dictionary in dictionaryIndexes.items()}
+    html_ptr.write("    var taskDictionaries = %s;\n" %encode_json(taskDictionaries))
+    html_ptr.write("</script>\n")
+
+    logger.info("    Exiting write_task_data_json")
+
+#------------------------------------------------------------------#
+def encode_json(value):
+    # These characters only appear within strings in json, so escaping them keeps a task
+    # summary such as <!--<script> or </script> from changing how the script block is parsed
+    return json.dumps(value, separators=(",", ":")).replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026")
+
+#------------------------------------------------------------------#
+def iterate_report_tasks(reportData):
+
+    # Streamed task data can only be consumed once, as it is fetched
+    if reportData["taskStream"] is not None:
+        for project, task in reportData["taskStream"]:
+            yield project, task
+    else:
+        projectData = reportData["projectData"]
+        for project in reportData["projectList"]:
+            for task in projectData[project["projectName"]]["projectTaskData"]:
+                yield project, task
@@ -0,0 +1,123 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_assets.py
+'''
+
+import logging
+import os
+import json
+import base64
+import re
+
+import report_cache
+
+logger = logging.getLogger(__name__)
+
+scriptDirectory = os.path.dirname(os.path.realpath(__file__))
+cssFile =  os.path.join(scriptDirectory, "html-assets/css/revenera_common.css")
+logoImageFile =  os.path.join(scriptDirectory, "html-assets/images/logo_reversed.svg")
+iconFile =  os.path.join(scriptDirectory, "html-assets/images/favicon-revenera.ico")
+assetCacheFile = os.path.join(report_cache.cacheDirectory, "branding_assets.json")
+
+brandingAssets = {}  # Assets already prepared by this process
+
+#-------------------------------------------------------------------#
+def get_branding_assets():
+    '''
+    Return the minified css and the base64 encoded logo and favicon.
+    The prepared assets are kept in memory and in the cache directory
+    and are only rebuilt when one of the source files changes.
+    '''
+    global brandingAssets
+
+    assetFingerprint = get_asset_fingerprint()
+
+    if brandingAssets.get("fingerprint") == assetFingerprint:
+        return brandingAssets
+
+    cachedAssets = read_asset_cache()
+    if cachedAssets.get("fingerprint") == assetFingerprint:
+        logger.debug("Using cached branding assets")
+        brandingAssets = cachedAssets
+        return brandingAssets
+
+    logger.info("Preparing branding assets")
+
+    preparedAssets = {}
+    preparedAssets["fingerprint"] = assetFingerprint
+    preparedAssets["css"] = minify_css(read_css_file())
+    preparedAssets["logo"] = encodeImage(logoImageFile).decode('utf-8')
+    preparedAssets["favicon"] = encodeImage(iconFile).decode('utf-8')
+
+    report_cache.write_cache_file(assetCacheFile, preparedAssets)
+
+    brandingAssets = preparedAssets
+    return brandingAssets
+
+#-------------------------------------------------------------------#
+def get_asset_fingerprint():
+
+    assetFingerprint = []
+
+    for assetFile in [cssFile, logoImageFile, iconFile]:
+        try:
+            fileDetails = os.stat(assetFile)
+            assetFingerprint.append([assetFile, fileDetails.st_mtime_ns, fileDetails.st_size])
+        except OSError:
+            assetFingerprint.append([assetFile, None, None])
+
+    return assetFingerprint
+
+#-------------------------------------------------------------------#
+def read_asset_cache():
+
+    if not os.path.exists(assetCacheFile):
+        return {}
+
+    try:
+        with open(assetCacheFile, "r") as f_ptr:
+            return json.load(f_ptr)
+    except (OSError, ValueError):
+        logger.warning("Unable to read branding asset cache %s.  Ignoring it." %assetCacheFile)
+        return {}
+
+#-------------------------------------------------------------------#
+def read_css_file():
+
+    # A missing stylesheet leaves the report unstyled rather than failing it
+    try:
+        with open(cssFile) as f_ptr:
+            logger.debug("Adding css file details")
+            return f_ptr.read()
+    except:
+        logger.error("Unable to open %s" %cssFile)
+        print("Unable to open %s" %cssFile)
+        return ""
+
+#-------------------------------------------------------------------#
+def minify_css(cssText):
+
+    cssText = re.sub(r"/\*.*?\*/", "", cssText, flags=re.S)  # Comments
+    cssText = re.sub(r"\s+", " ", cssText)  # Runs of whitespace
+    cssText = re.sub(r"\s*([{};,>])\s*", r"\1", cssText)  # Whitespace around delimiters
+    cssText = re.sub(r":\s+", ":", cssText)  # Whitespace after a property name
+    cssText = cssText.replace(";}", "}")
+
+    return cssText.strip()
+
+####################################################################
+def encodeImage(imageFile):
+
+    #############################################
+    # Create base64 variable for branding image
+    try:
+        with open(imageFile,"rb") as image:
+            logger.debug("Encoding image: %s" %imageFile)
+            encodedImage = base64.b64encode(image.read())
+            return encodedImage
+    except:
+        logger.error("Unable to open %s" %imageFile)
+        raise
@@ -0,0 +1,234 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_async.py
+'''
+
+import logging
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+import report_cache
+import report_session
+
+logger = logging.getLogger(__name__)
+
+congestionStatusCodes = [429, 503]  # Responses that mean the server wants fewer requests
+maxRetries = 5  # Attempts for a request that was throttled by the server
+latencyTolerance = 3.0  # Multiple of the baseline latency treated as congestion
+minCongestionLatency = 0.25  # Seconds a response must take before it can be treated as congestion
+decreaseFactor = 0.5  # Multiplicative decrease applied to the request limit on congestion
+
+#-------------------------------------------------------------------#
+class AdaptiveLimiter(object):
+    '''
+    Limit the number of in flight requests using additive increase and
+    multiplicative decrease.  Each successful request within the latency
+    tolerance grows the limit by roughly one per round trip while a
+    throttled, failed or slow request halves it.
+    '''
+
+    def __init__(self, maxLimit):
+        self.maxLimit = max(1, maxLimit)
+        self.limit = float(max(1, self.maxLimit // 2))
+        self.inFlight = 0
+        self.baselineLatency = {}
+        self.lastDecrease = 0
+        self.condition = asyncio.Condition()
+
+    #---------------------------------------------------------------#
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.inFlight < int(self.limit))
+            self.inFlight += 1
+
+    #---------------------------------------------------------------#
+    async def release(self, requestType, latency, congested):
+        async with self.condition:
+            self.inFlight -= 1
+
+            # Track the typical latency per request type since a page of tasks
+            # is always slower than a user lookup.  Let the baseline creep up
+            # slowly so one unusually fast response does not pin it
+            baseline = self.baselineLatency.get(requestType, latency)
+            baseline = min(latency, baseline + (latency - baseline) * 0.05)
+            self.baselineLatency[requestType] = baseline
+
+            # The absolute minimum avoids reacting to jitter when responses are very fast
+            slowResponse = latency > latencyTolerance * baseline and latency > minCongestionLatency
+
+            if congested or slowResponse:
+                currentTime = time.monotonic()
+                # Treat a burst of slow responses as a single congestion event
+                if currentTime - self.lastDecrease > latency:
+                    self.limit = max(1.0, self.limit * decreaseFactor)
+                    self.lastDecrease = currentTime
+                    logger.debug("    Congestion on %s request (%.3fs). Request limit reduced to %s" %(requestType, latency, int(self.limit)))
+            else:
+                self.limit = min(float(self.maxLimit), self.limit + 1.0 / self.limit)
+
+            self.condition.notify_all()
+
+#-------------------------------------------------------------------#
+class AsyncCollector(object):
+    '''
+    Collect the project hierarchy, tasks and users as coroutines.  The
+    blocking REST calls are made through the shared ReportSession on a
+    thread pool so the pooled connections and request timings are still
+    used, with the AdaptiveLimiter deciding how many run at once.  Point
+    the session at any server, such as a local stub, to exercise it.
+    '''
+
+    def __init__(self, reportSession, maxConcurrentRequests, taskFilter):
+        self.reportSession = reportSession
+        self.taskFilter = taskFilter
+        self.limiter = AdaptiveLimiter(maxConcurrentRequests)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, maxConcurrentRequests))
+        self.userData = {}
+        self.userLookups = {}
+
+    #---------------------------------------------------------------#
+    async def call(self, requestType, function, *args):
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(maxRetries):
+            await self.limiter.acquire()
+            startTime = time.monotonic()
+            congested = True  # Anything other than a completed request, including an unexpected exception
+            retryDelay = None
+
+            try:
+                result = await loop.run_in_executor(self.executor, function, *args)
+                congested = False
+            except requests.HTTPError as error:
+                statusCode = error.response.status_code
+                congested = statusCode in congestionStatusCodes or statusCode >= 500
+
+                if statusCode not in congestionStatusCodes or attempt == maxRetries - 1:
+                    raise
+
+                retryAfter = error.response.headers.get("Retry-After", "")
+                retryDelay = int(retryAfter) if retryAfter.isdigit() else 2 ** attempt
+                logger.debug("    %s request throttled (%s).  Retrying in %ss" %(requestType, statusCode, retryDelay))
+            finally:
+                # Every attempt gives back its slot however it ends or the limiter runs out of slots
+                await self.limiter.release(requestType, time.monotonic() - startTime, congested)
+
+            if retryDelay is None:
+                return result
+
+            await asyncio.sleep(retryDelay)
+
+    #---------------------------------------------------------------#
+    async def get_project_tasks(self, projectID):
+        taskDataResponse = []
+
+        try:
+            # Each page is its own request so the limiter sees every round trip
+            # and a throttled page can be retried on its own
+            offset = 1
+            while True:
+                taskPage = await self.call("tasks", self.reportSession.get_task_page_for_project, projectID, offset, self.taskFilter.queryParameters)
+                lastPage = len(taskPage) < report_session.pageSize
+
+                # Tasks outside the report's filters are dropped before their users are looked up
+                taskPage = self.taskFilter.filter_tasks(taskPage)
+                taskDataResponse += taskPage
+                self.start_user_lookups(taskPage)
+
+                if lastPage:
+                    break
+                offset += 1
+        except:
+            logger.error("    No Task Information Returned for project %s!" %projectID)
+            print("No Task Information Returned for project %s." %projectID)
+
+        return taskDataResponse
+
+    #---------------------------------------------------------------#
+    def start_user_lookups(self, taskPage):
+        # Users are looked up while the remaining tasks are still being collected
+        for task in taskPage:
+            for userID in (task["ownerId"], task["createdById"]):
+                if userID not in self.userData and userID not in self.userLookups:
+                    self.userLookups[userID] = asyncio.ensure_future(self.get_user_full_name(userID))
+
+    #---------------------------------------------------------------#
+    async def get_user_full_name(self, userID):
+        try:
+            userDetails = await self.call("users", self.reportSession.get_user_details_by_id, userID)
+            return userDetails[0]["firstName"] + " " + userDetails[0]["lastName"]
+        except:
+            logger.error("    Unable to get details for user %s" %userID)
+            return None
+
+    #---------------------------------------------------------------#
+    async def collect(self, projectID, includeChildProjects, projectHierarchy=None):
+        logger.info("Entering AsyncCollector.collect")
+
+        self.userData = report_cache.load_user_directory(self.reportSession.baseURL)
+
+        if projectHierarchy is None:
+            projectHierarchy = await self.call("hierarchy", self.reportSession.get_child_projects_recursively, projectID)
+
+        projectIDs = [projectHierarchy["id"]]
+        if includeChildProjects == "true":
+            projectIDs += get_descendant_project_ids(projectHierarchy)
+
+        projectTaskResponses = await asyncio.gather(*[self.get_project_tasks(childProjectID) for childProjectID in projectIDs])
+        tasksByProject = dict(zip(projectIDs, projectTaskResponses))
+
+        userIDs = list(self.userLookups)
+        userNames = await asyncio.gather(*[self.userLookups[userID] for userID in userIDs])
+
+        newUserData = {}
+        for userID, userFullName in zip(userIDs, userNames):
+            if userFullName is None:
+                self.userData[userID] = str(userID)
+            else:
+                self.userData[userID] = userFullName
+                newUserData[userID] = userFullName
+
+        report_cache.save_user_directory(self.reportSession.baseURL, newUserData)
+
+        logger.debug("    Request limit finished at %s" %int(self.limiter.limit))
+        logger.info("Exiting AsyncCollector.collect")
+
+        return projectHierarchy, tasksByProject, self.userData
+
+#-------------------------------------------------------------------#
+def collect_report_data(reportSession, projectID, includeChildProjects, maxConcurrentRequests, taskFilter, projectHierarchy=None):
+    logger.info("Entering collect_report_data")
+
+    collectedData = asyncio.run(run_async_collector(reportSession, projectID, includeChildProjects, maxConcurrentRequests, taskFilter, projectHierarchy))
+
+    logger.info("Exiting collect_report_data")
+    return collectedData
+
+#-------------------------------------------------------------------#
+async def run_async_collector(reportSession, projectID, includeChildProjects, maxConcurrentRequests, taskFilter, projectHierarchy):
+
+    # Created within the running loop so the limiter's condition belongs to it
+    asyncCollector = AsyncCollector(reportSession, maxConcurrentRequests, taskFilter)
+
+    try:
+        return await asyncCollector.collect(projectID, includeChildProjects, projectHierarchy)
+    finally:
+        asyncCollector.executor.shutdown()
+
+#-------------------------------------------------------------------#
+def get_descendant_project_ids(project):
+
+    descendantProjectIDs = []
+    childProjects = list(project["childProject"])
+
+    while childProjects:
+        childProject = childProjects.pop()
+        descendantProjectIDs.append(childProject["id"])
+        childProjects += childProject["childProject"]
+
+    return descendantProjectIDs
@@ -0,0 +1,236 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_batch.py
+
+Create the report for many projects in one invocation.
+
+    python3 report_batch.py -baseURL https://sca.codeinsight.com:8443 -authToken ... -rid 2 -projects 10,11,12:3
+    python3 report_batch.py -baseURL ... -authToken ... -projectFile projects.txt -processes 4 -reportOpts '{"includeChildProjects" : "true"}'
+
+Each project is listed as projectID or projectID:reportID, one per line
+in a project file.  Projects without a report ID use -rid.  The reports
+are created by a pool of processes that each keep one pooled session
+for all of the reports they create, and the user directory cache is
+filled once before the first report starts.  Every report is uploaded
+to its own project and report ID exactly as create_report.py would.
+'''
+import sys
+import os
+import re
+import io
+import json
+import time
+import logging
+import argparse
+import atexit
+import contextlib
+import multiprocessing
+import concurrent.futures
+
+import report_logging
+import report_metrics
+
+outputDirectory = os.path.dirname(os.path.realpath(__file__))
+batchLogFile = os.path.join(outputDirectory, "_project_task_report_batch.log")
+batchResultsFile = os.path.join(outputDirectory, "_project_task_report_batch.json")
+batchLogFormat = '%(asctime)s,%(msecs)d %(levelname)-8s %(processName)s [%(filename)s:%(lineno)d] %(message)s'
+
+defaultProcesses = 4
+maxProcesses = 32
+outputLinesOnFailure = 20  # Lines of a failed report's output written to the log
+
+logger = logging.getLogger("report_batch")
+
+batchSessionCache = None  # The sessions kept by this process for all of its reports
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-projects", "--projects", help="Comma separated project IDs, each optionally followed by :reportID")
+parser.add_argument("-projectFile", "--projectFile", help="File with one project ID per line, optionally followed by a report ID")
+parser.add_argument("-rid", "--reportID", help="Report ID used for projects listed without one")
+parser.add_argument("-authToken", "--authToken", help="Code Insight Authorization Token")
+parser.add_argument("-baseURL", "--baseURL", help="Code Insight Core Server Protocol/Domain Name/Port.  i.e. http://localhost:8888 or https://sca.codeinsight.com:8443")
+parser.add_argument("-reportOpts", "--reportOptions", default='{"includeChildProjects" : "true"}', help="Options for report content (JSON) used for every project")
+parser.add_argument("-processes", "--processes", type=int, default=defaultProcesses, help="Reports created at the same time (1-%s)" %maxProcesses)
+
+#----------------------------------------------------------------------#
+def main():
+    args = parser.parse_args()
+
+    batchProjects, errorMsg = get_batch_projects(args.projects, args.projectFile, args.reportID)
+
+    if not args.authToken or not args.baseURL:
+        errorMsg.append("Both -authToken and -baseURL are required")
+    if not 1 <= args.processes <= maxProcesses:
+        errorMsg.append("-processes must be between 1 and %s" %maxProcesses)
+    try:
+        json.loads(args.reportOptions)
+    except ValueError:
+        errorMsg.append("-reportOpts is not valid JSON")
+
+    if errorMsg:
+        for message in errorMsg:
+            print("    *** ERROR  ***  %s" %message)
+        return 2
+
+    numProcesses = min(args.processes, len(batchProjects))
+
+    # The report processes are started fresh rather than forked from this one since it is running threads
+    processContext = multiprocessing.get_context("spawn")
+    logQueue = processContext.Queue() if numProcesses > 1 else None
+    report_logging.configure_logging(batchLogFile, logQueue=logQueue, recordFormat=batchLogFormat)
+
+    logger.info("Creating %s reports using %s processes" %(len(batchProjects), numProcesses))
+    print("Creating %s reports using %s processes" %(len(batchProjects), numProcesses))
+
+    prime_user_directory(args.baseURL, args.authToken)
+
+    batchStartTime = time.perf_counter()
+    batchResults = []
+
+    if numProcesses == 1:
+        # Create the reports in this process one after another with a single session
+        start_batch_process(None, None)
+        for projectID, reportID in batchProjects:
+            batchResults.append(create_batch_report(projectID, reportID, args.authToken, args.baseURL, args.reportOptions))
+            print_batch_result(batchResults[-1], len(batchResults), len(batchProjects))
+    else:
+        logLevel = report_logging.get_default_log_level()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=numProcesses, mp_context=processContext, initializer=start_batch_process, initargs=(logQueue, logLevel)) as executor:
+            batchReports = [executor.submit(create_batch_report, projectID, reportID, args.authToken, args.baseURL, args.reportOptions) for projectID, reportID in batchProjects]
+
+            for batchReport in concurrent.futures.as_completed(batchReports):
+                batchResults.append(batchReport.result())
+                print_batch_result(batchResults[-1], len(batchResults), len(batchProjects))
+
+    batchSeconds = time.perf_counter() - batchStartTime
+    numFailed = len([batchResult for batchResult in batchResults if batchResult["status"] != "success"])
+
+    batchSummary = {}
+    batchSummary["processes"] = numProcesses
+    batchSummary["seconds"] = batchSeconds
+    batchSummary["reports"] = len(batchResults)
+    batchSummary["failed"] = numFailed
+    batchSummary["results"] = sorted(batchResults, key=lambda batchResult: batchProjects.index((batchResult["projectID"], batchResult["reportID"])))
+    report_metrics.write_metrics_file(batchResultsFile, json.dumps(batchSummary, indent=4))
+
+    logger.info("Created %s reports in %.1fs with %s failures" %(len(batchResults), batchSeconds, numFailed))
+    print("Created %s reports in %.1fs with %s failures" %(len(batchResults), batchSeconds, numFailed))
+
+    return 1 if numFailed else 0
+
+#----------------------------------------------------------------------#
+def get_batch_projects(projects, projectFile, defaultReportID):
+
+    batchProjects = []
+    errorMsg = []
+
+    projectEntries = []
+    if projects:
+        projectEntries += projects.split(",")
+    if projectFile:
+        try:
+            with open(projectFile) as project_ptr:
+                projectEntries += [projectLine.split("#")[0] for projectLine in project_ptr]
+        except OSError:
+            errorMsg.append("Unable to read the project file %s" %projectFile)
+
+    for projectEntry in projectEntries:
+        projectEntry = projectEntry.strip()
+        if not projectEntry:
+            continue
+
+        # projectID or projectID:reportID.  A project file may also separate them with a comma or spaces
+        entryIDs = re.split(r"[\s,:]+", projectEntry)
+        projectID = entryIDs[0]
+        reportID = entryIDs[1] if len(entryIDs) > 1 else defaultReportID
+
+        if len(entryIDs) > 2 or not projectID.isdigit() or not str(reportID).isdigit():
+            errorMsg.append("Invalid project entry '%s'.  Use projectID or projectID:reportID, with -rid for the default report ID" %projectEntry)
+        elif (projectID, reportID) not in batchProjects:
+            batchProjects.append((projectID, reportID))
+
+    if not batchProjects and not errorMsg:
+        errorMsg.append("No projects were given.  Use -projects and/or -projectFile")
+
+    return batchProjects, errorMsg
+
+#----------------------------------------------------------------------#
+def prime_user_directory(baseURL, authToken):
+    logger.info("Entering prime_user_directory")
+
+    import report_cache
+    import report_session
+
+    # Every report then finds its task owners in the user directory cache instead of looking them up
+    reportSession = report_session.ReportSession(baseURL, authToken, 1)
+    try:
+        userData = {}
+        for userDetails in reportSession.get_all_users():
+            userData[userDetails["id"]] = userDetails["firstName"] + " " + userDetails["lastName"]
+        report_cache.save_user_directory(baseURL, userData)
+        print("    Cached %s users for the batch" %len(userData))
+    except Exception as error:
+        logger.warning("Unable to get the list of all users (%s).  Each report will look up its own users." %error)
+    finally:
+        reportSession.close()
+
+    logger.info("Exiting prime_user_directory")
+
+#----------------------------------------------------------------------#
+def start_batch_process(logQueue, logLevel):
+    global batchSessionCache
+
+    # Log to the batch log file rather than have each report replace _project_task_report.log
+    if logQueue is not None:
+        report_logging.forward_logging(logQueue, logLevel)
+
+    import report_session
+
+    batchSessionCache = report_session.ReportSessionCache()
+    atexit.register(batchSessionCache.close)
+
+#----------------------------------------------------------------------#
+def create_batch_report(projectID, reportID, authToken, baseURL, reportOptions):
+    import create_report
+    import report_profile
+
+    commandLineArgs = ["-pid", projectID, "-rid", reportID, "-authToken", authToken, "-baseURL", baseURL, "-reportOpts", create_report.quote_report_options(reportOptions)]
+
+    batchResult = {}
+    batchResult["projectID"] = projectID
+    batchResult["reportID"] = reportID
+
+    logger.info("Creating report for project %s" %projectID)
+
+    # The reports run at the same time so their progress output is only kept for the log
+    reportOutput = io.StringIO()
+    startTime = time.perf_counter()
+
+    try:
+        with contextlib.redirect_stdout(reportOutput):
+            create_report.main(commandLineArgs, batchSessionCache)
+        batchResult["status"] = report_metrics.runMetrics.get("status", "success")
+        batchResult["counts"] = report_metrics.runMetrics.get("counts", {})
+    except (Exception, SystemExit) as error:
+        logger.exception("Report failed for project %s" %projectID)
+        logger.error("Report output:\n%s" %"\n".join(reportOutput.getvalue().splitlines()[-outputLinesOnFailure:]))
+        batchResult["status"] = "failed"
+        batchResult["error"] = str(error)
+    finally:
+        report_profile.stop_profiling()
+
+    batchResult["seconds"] = time.perf_counter() - startTime
+
+    return batchResult
+
+#----------------------------------------------------------------------#
+def print_batch_result(batchResult, numCompleted, numReports):
+    print("    [%s/%s] Project %s report %s: %s in %.1fs" %(numCompleted, numReports, batchResult["projectID"], batchResult["reportID"], batchResult["status"], batchResult["seconds"]))
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_cache.py
+'''
+
+import logging
+import os
+import json
+import time
+import tempfile
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+cacheDirectory = os.path.join(os.path.dirname(os.path.realpath(__file__)), "cache")
+userDirectoryFile = os.path.join(cacheDirectory, "user_directory.json")
+userDirectoryTTL = 24 * 60 * 60  # Seconds before a cached user name is looked up again
+projectHierarchyFile = os.path.join(cacheDirectory, "project_hierarchy.json")
+projectHierarchyTTL = 60 * 60  # Seconds before a cached list of child projects is requested again
+taskSnapshotFile = os.path.join(cacheDirectory, "task_snapshots.db")
+taskSnapshotMaxAge = 7 * 24 * 60 * 60  # Seconds between full task downloads for a project
+
+parsedCacheFiles = {}  # Cache file contents already read by this process with the file's mtime and size
+
+#-------------------------------------------------------------------#
+def load_user_directory(baseURL):
+    logger.info("Entering load_user_directory")
+
+    userData = {}
+    currentTime = time.time()
+
+    userDirectory = read_user_directory_file()
+    serverUsers = userDirectory.get(str(baseURL), {})
+
+    for userID, (userFullName, cachedOn) in serverUsers.items():
+        if currentTime - cachedOn < userDirectoryTTL:
+            userData[convert_cache_id(userID)] = userFullName
+
+    logger.debug("    Loaded %s of %s cached users" %(len(userData), len(serverUsers)))
+    logger.info("Exiting load_user_directory")
+
+    return userData
+
+#-------------------------------------------------------------------#
+def save_user_directory(baseURL, newUserData):
+    logger.info("Entering save_user_directory")
+
+    if not newUserData:
+        logger.info("Exiting save_user_directory")
+        return
+
+    currentTime = time.time()
+
+    # Re-read the file so entries written by other report runs are not lost
+    userDirectory = read_user_directory_file()
+    serverUsers = userDirectory.setdefault(str(baseURL), {})
+
+    # Drop anything that has expired while adding the new entries
+    for userID in [userID for userID, (_, cachedOn) in serverUsers.items() if currentTime - cachedOn >= userDirectoryTTL]:
+        serverUsers.pop(userID)
+
+    for userID, userFullName in newUserData.items():
+        serverUsers[str(userID)] = [userFullName, currentTime]
+
+    write_cache_file(userDirectoryFile, userDirectory)
+
+    logger.debug("    User directory now contains %s users for %s" %(len(serverUsers), baseURL))
+    logger.info("Exiting save_user_directory")
+
+#-------------------------------------------------------------------#
+def read_user_directory_file():
+    return read_cache_file(userDirectoryFile)
+
+#-------------------------------------------------------------------#
+def load_project_children(baseURL):
+    logger.info("Entering load_project_children")
+
+    projectChildren = {}
+    projectCachedOn = {}  # When each child project list was requested so the caller can report its age
+    currentTime = time.time()
+
+    projectHierarchy = read_cache_file(projectHierarchyFile)
+    serverProjects = projectHierarchy.get(str(baseURL), {})
+
+    for projectID, (projectDetails, cachedOn) in serverProjects.items():
+        if currentTime - cachedOn < projectHierarchyTTL:
+            projectChildren[convert_cache_id(projectID)] = projectDetails
+            projectCachedOn[convert_cache_id(projectID)] = cachedOn
+
+    logger.debug("    Loaded %s of %s cached child project lists" %(len(projectChildren), len(serverProjects)))
+    logger.info("Exiting load_project_children")
+
+    return projectChildren, projectCachedOn
+
+#-------------------------------------------------------------------#
+def save_project_children(baseURL, newProjectChildren):
+    logger.info("Entering save_project_children")
+
+    if not newProjectChildren:
+        logger.info("Exiting save_project_children")
+        return
+
+    currentTime = time.time()
+
+    # Re-read the file so entries written by other report runs are not lost
+    projectHierarchy = read_cache_file(projectHierarchyFile)
+    serverProjects = projectHierarchy.setdefault(str(baseURL), {})
+
+    for projectID in [projectID for projectID, (_, cachedOn) in serverProjects.items() if currentTime - cachedOn >= projectHierarchyTTL]:
+        serverProjects.pop(projectID)
+
+    for projectID, projectDetails in newProjectChildren.items():
+        serverProjects[str(projectID)] = [projectDetails, currentTime]
+
+    write_cache_file(projectHierarchyFile, projectHierarchy)
+
+    logger.debug("    Project hierarchy cache now contains %s projects for %s" %(len(serverProjects), baseURL))
+    logger.info("Exiting save_project_children")
+
+#-------------------------------------------------------------------#
+def read_cache_file(cacheFile):
+
+    if not os.path.exists(cacheFile):
+        return {}
+
+    # A long running report worker keeps the parsed file until it changes
+    try:
+        fileDetails = os.stat(cacheFile)
+        fileVersion = (fileDetails.st_mtime_ns, fileDetails.st_size)
+    except OSError:
+        fileVersion = None
+
+    if fileVersion is not None and parsedCacheFiles.get(cacheFile, (None, None))[0] == fileVersion:
+        return parsedCacheFiles[cacheFile][1]
+
+    try:
+        with open(cacheFile, "r") as f_ptr:
+            cacheData = json.load(f_ptr)
+    except (OSError, ValueError):
+        logger.warning("Unable to read cache file %s.  Ignoring it." %cacheFile)
+        return {}
+
+    parsedCacheFiles[cacheFile] = (fileVersion, cacheData)
+    return cacheData
+
+#-------------------------------------------------------------------#
+def write_cache_file(cacheFile, cacheData):
+
+    # The caller may have changed the parsed copy so it is read again next time
+    parsedCacheFiles.pop(cacheFile, None)
+
+    try:
+        os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+
+        # Write to a temp file and move it into place so a concurrent report never reads a partial file
+        fileDescriptor, tempFile = tempfile.mkstemp(dir=os.path.dirname(cacheFile), suffix=".tmp")
+        with os.fdopen(fileDescriptor, "w") as f_ptr:
+            json.dump(cacheData, f_ptr)
+        os.replace(tempFile, cacheFile)
+    except OSError:
+        logger.warning("Unable to write cache file %s" %cacheFile)
+
+#-------------------------------------------------------------------#
+def convert_cache_id(cacheID):
+    # JSON keys are always strings but the REST API returns numeric IDs
+    return int(cacheID) if cacheID.isdigit() else cacheID
+
+#-------------------------------------------------------------------#
+def open_task_snapshots():
+    logger.info("Entering open_task_snapshots")
+
+    os.makedirs(cacheDirectory, exist_ok=True)
+
+    connection = sqlite3.connect(taskSnapshotFile)
+    connection.execute("CREATE TABLE IF NOT EXISTS project_sync (server TEXT, projectID TEXT, lastSync REAL, lastFullSync REAL, PRIMARY KEY (server, projectID))")
+    connection.execute("CREATE TABLE IF NOT EXISTS task (server TEXT, projectID TEXT, taskID TEXT, taskDetails TEXT, PRIMARY KEY (server, projectID, taskID))")
+    connection.commit()
+
+    logger.info("Exiting open_task_snapshots")
+    return connection
+
+#-------------------------------------------------------------------#
+def get_project_sync_times(connection, baseURL, projectID):
+
+    syncTimes = connection.execute("SELECT lastSync, lastFullSync FROM project_sync WHERE server = ? AND projectID = ?", (str(baseURL), str(projectID))).fetchone()
+
+    if syncTimes is None:
+        return None, None
+
+    return syncTimes
+
+#-------------------------------------------------------------------#
+def get_project_snapshot(connection, baseURL, projectID):
+
+    rows = connection.execute("SELECT taskDetails FROM task WHERE server = ? AND projectID = ? ORDER BY CAST(taskID AS INTEGER), taskID", (str(baseURL), str(projectID)))
+
+    return [json.loads(taskDetails) for (taskDetails,) in rows]
+
+#-------------------------------------------------------------------#
+def merge_project_snapshot(connection, baseURL, projectID, syncTime, taskDataResponse, fullSync):
+    logger.debug("    Merging %s tasks into snapshot for project %s (full sync: %s)" %(len(taskDataResponse), projectID, fullSync))
+
+    server = str(baseURL)
+    projectID = str(projectID)
+
+    with connection:
+        if fullSync:
+            # A full sync is the only way to drop tasks that no longer exist on the server
+            connection.execute("DELETE FROM task WHERE server = ? AND projectID = ?", (server, projectID))
+            connection.execute("INSERT OR REPLACE INTO project_sync VALUES (?, ?, ?, ?)", (server, projectID, syncTime, syncTime))
+        else:
+            connection.execute("UPDATE project_sync SET lastSync = ? WHERE server = ? AND projectID = ?", (syncTime, server, projectID))
+
+        connection.executemany("INSERT OR REPLACE INTO task VALUES (?, ?, ?, ?)", 
+            [(server, projectID, str(task["id"]), json.dumps(task)) for task in taskDataResponse])
+
+    return get_project_snapshot(connection, baseURL, projectID)
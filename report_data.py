@@ -9,29 +9,61 @@ File : report_data.py.py
 '''
 
 import logging
-import CodeInsight_RESTAPIs.project.get_child_projects
-import CodeInsight_RESTAPIs.task.search_tasks
-import CodeInsight_RESTAPIs.users.search_users
+import sys
+import time
+import threading
+import queue
+import collections
+from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor
 
+import report_cache
+import report_metrics
 
 
 logger = logging.getLogger(__name__)
+taskLogger = logging.getLogger(__name__ + ".tasks")  # Only enabled by the tasks log level
+
+taskSyncOverlap = 5 * 60  # Seconds to overlap incremental syncs by
+bulkUserLookupThreshold = 100  # Unresolved users before the full user list is requested instead
 
 #-------------------------------------------------------------------#
-def gather_data_for_report(baseURL, projectID, authToken, reportName, reportOptions):
+def gather_data_for_report(reportSession, projectID, reportName, reportOptions):
     logger.info("Entering gather_data_for_report")
 
+    baseURL = reportSession.baseURL
+
     # Parse report options
     includeChildProjects = reportOptions["includeChildProjects"]  # True/False
+    concurrentRequests = reportOptions["concurrentRequests"]  # Max number of projects to collect at once
+    incrementalSync = reportOptions["incrementalSync"]  # True/False
+    streamTaskData = reportOptions["streamTaskData"]  # True/False
+    collectionEngine = reportOptions["collectionEngine"]  # threads/asyncio
+    hierarchyDiscovery = reportOptions["hierarchyDiscovery"]  # recursive/levels
+
+    taskFilter = TaskFilter(reportOptions)
 
 
     projectList = [] # List to hold parent/child details for report
     projectData = {} # Create a dictionary containing the project level summary data using project names as keys
-    userData = {} # Dict to map user ID to names
-    projectTaskData = {}
 
     # Get the list of parent/child projects start at the base project
-    projectHierarchy = CodeInsight_RESTAPIs.project.get_child_projects.get_child_projects_recursively(baseURL, projectID, authToken)
+    if hierarchyDiscovery == "levels":
+        with report_metrics.phase("hierarchy"):
+            projectHierarchy = discover_project_hierarchy(reportSession, projectID, includeChildProjects, concurrentRequests)
+    else:
+        projectHierarchy = None
+
+    if collectionEngine == "asyncio" and streamTaskData != "true" and incrementalSync != "true":
+        # The hierarchy (unless already discovered), tasks and users are all collected by the asyncio engine
+        import report_async  # asyncio is only loaded by the runs that use it
+        with report_metrics.phase("asyncCollection"):
+            projectHierarchy, tasksByProject, userData = report_async.collect_report_data(reportSession, projectID, includeChildProjects, concurrentRequests, taskFilter, projectHierarchy)
+    else:
+        if projectHierarchy is None:
+            with report_metrics.phase("hierarchy"):
+                projectHierarchy = reportSession.get_child_projects_recursively(projectID)
+        tasksByProject = None
 
     # Create a list of project data sorted by the project name at each level for report display  
     # Add details for the parent node
@@ -50,7 +82,57 @@ def gather_data_for_report(baseURL, projectID, authToken, reportName, reportOpti
         logger.debug("Child hierarchy disabled")
 
 
-    for project in projectList:
+    # Build up the data to return for the
+    reportData = {}
+    reportData["reportName"] = reportName
+    reportData["reportOptions"] = reportOptions
+    reportData["projectName"] = projectHierarchy["name"]
+    reportData["projectID"] = projectHierarchy["id"]
+    reportData["projectList"] = projectList
+    reportData["staleProjects"] = []  # Projects reported from a stored task snapshot that could not be synced
+
+    # The rollups are added to as each task is created, including when the tasks are streamed
+    taskSummary = TaskSummary()
+    reportData["taskSummary"] = taskSummary
+
+    report_metrics.add_count("projects", len(projectList))
+
+    if streamTaskData == "true":
+        # Nothing is collected yet.  The tasks are fetched as the report artifacts consume the stream
+        logger.debug("Streaming task data to the report artifacts")
+        reportData["projectData"] = None
+        reportData["taskStream"] = stream_project_task_data(reportSession, projectList, concurrentRequests, taskSummary, taskFilter)
+
+        logger.info("Exiting gather_data_for_report")
+        return reportData
+
+    # Collect the tasks for all projects up front.  The responses are returned in the
+    # same order as projectList regardless of the order the requests complete in
+    if tasksByProject is not None:
+        projectTaskResponses = [tasksByProject[project["projectID"]] for project in projectList]
+    else:
+        with report_metrics.phase("tasks"):
+            if incrementalSync == "true":
+                # The snapshots hold every task so the filters are only applied to the synced tasks
+                projectTaskResponses, staleProjectIDs = sync_project_tasks(reportSession, projectList, concurrentRequests)
+                reportData["staleProjects"] = [project["projectName"] for project in projectList if project["projectID"] in staleProjectIDs]
+            else:
+                projectTaskResponses = collect_project_tasks(reportSession, projectList, concurrentRequests, taskFilter.queryParameters)
+
+        # Drop the tasks outside the report's filters before their users are looked up
+        projectTaskResponses = [taskFilter.filter_tasks(taskDataResponse) for taskDataResponse in projectTaskResponses]
+
+        # Resolve the owners and creators for all of the tasks in a single stage
+        userIDs = set()
+        for taskDataResponse in projectTaskResponses:
+            for task in taskDataResponse:
+                userIDs.add(task["ownerId"])
+                userIDs.add(task["createdById"])
+
+        with report_metrics.phase("users"):
+            userData = resolve_users(reportSession, userIDs, concurrentRequests)
+
+    for project, taskDataResponse in zip(projectList, projectTaskResponses):
         projectID = project["projectID"]
         projectName = project["projectName"]
         projectLink = project["projectLink"]
@@ -61,70 +143,17 @@ def gather_data_for_report(baseURL, projectID, authToken, reportName, reportOpti
         projectData[projectName]["projectLink"] = projectLink
         projectData[projectName]["projectTaskData"] = []
 
-        # Get project task data
-        try:
-            taskDataResponse = CodeInsight_RESTAPIs.task.search_tasks.get_all_tasks_for_project(baseURL, authToken, projectID)
-        except:
-            logger.error("    No Task Information Returned!")
-            print("No Task Information Returned.")
-   
-
         for task in taskDataResponse:
-            projectTaskData = {}
-            print(task)
-           
-            taskOwner = task["ownerId"]
-            taskCreator = task["createdById"]
-            createdDate = task["createdDate"]
-            taskClosed = task["closed"]
-            taskType = task["taskName"].split(" ")[0]
-
-            createdDate, createdTime = createdDate.split(" ")
- 
-            if taskOwner not in userData:      
-                userDetails = CodeInsight_RESTAPIs.users.search_users.get_user_details_by_id(baseURL, authToken, taskOwner)
-                userFullName = userDetails[0]["firstName"] + " " + userDetails[0]["lastName"]
-                userData[taskOwner] = userFullName
-
-            if taskCreator not in userData:
-                userDetails = CodeInsight_RESTAPIs.users.search_users.get_user_details_by_id(baseURL, authToken, taskCreator) 
-                userFullName = userDetails[0]["firstName"] + " " + userDetails[0]["lastName"]
-                userData[taskCreator] = userFullName
-
-            if taskClosed:
-                taskStatus = "Closed"
-            else:
-                taskStatus = "Open"
-
-            projectTaskData["inventoryId"] = task["inventoryId"]
-            projectTaskData["summary"] = task["summary"]
-            projectTaskData["priority"] = task["priority"]
-            projectTaskData["almIssues"] = task["almIssues"]
-
-            projectTaskData["taskCreator"] = userData[taskCreator]
-            projectTaskData["taskOwner"] = userData[taskOwner]
-            projectTaskData["createdDate"] = createdDate
-            projectTaskData["createdTime"] = createdTime
-            projectTaskData["taskStatus"] = taskStatus
-            projectTaskData["taskType"] = taskType
-
-    
-
-            projectData[projectName]["projectTaskData"].append(projectTaskData)
-                  
+            taskDetails = create_task_details(task, userData)
+            if taskFilter.matches_owner(taskDetails.taskOwner):
+                taskSummary.add_task(projectName, taskDetails)
+                projectData[projectName]["projectTaskData"].append(taskDetails)
 
     # for project in projectData:
     #     print(projectData[project])
 
-
-    # Build up the data to return for the
-    reportData = {}
-    reportData["reportName"] = reportName
-    reportData["projectHierarchy"] = projectHierarchy
-    reportData["projectName"] = projectHierarchy["name"]
-    reportData["projectID"] = projectHierarchy["id"]
-    reportData["projectList"] = projectList
     reportData["projectData"] = projectData
+    reportData["taskStream"] = None
 
 
     logger.info("Exiting gather_data_for_report")
@@ -132,26 +161,537 @@ def gather_data_for_report(baseURL, projectID, authToken, reportName, reportOpti
     return reportData
 
 
+#----------------------------------------------#
+class TaskRecord(collections.namedtuple("TaskRecord", ["inventoryId", "summary", "priority", "almIssues", "taskCreator", "taskOwner", "createdDate", "createdTime", "taskStatus", "taskType"])):
+    # A tuple per task is less than half the size of the equivalent dict and
+    # the empty __slots__ stops a per instance __dict__ being created
+    __slots__ = ()
+
+#----------------------------------------------#
+def create_task_details(task, userData):
+
+    if taskLogger.isEnabledFor(logging.DEBUG):
+        taskLogger.debug("    Task details: %s", task)
+
+    taskOwner = task["ownerId"]
+    taskCreator = task["createdById"]
+    createdDate = task["createdDate"]
+    taskClosed = task["closed"]
+    taskType = task["taskName"].split(" ")[0]
+
+    createdDate, createdTime = createdDate.split(" ")
+
+    if taskClosed:
+        taskStatus = "Closed"
+    else:
+        taskStatus = "Open"
+
+    # Only keep what the report displays for any external issues rather than the full REST payload
+    almIssues = tuple((issue["externalUrl"], issue["externalKey"]) for issue in task["almIssues"])
+
+    # Values repeated across many tasks share a single string object
+    projectTaskData = TaskRecord(
+        inventoryId = task["inventoryId"],
+        summary = task["summary"],
+        priority = sys.intern(str(task["priority"])),
+        almIssues = almIssues,
+        taskCreator = userData[taskCreator],
+        taskOwner = userData[taskOwner],
+        createdDate = sys.intern(createdDate),
+        createdTime = createdTime,
+        taskStatus = taskStatus,
+        taskType = sys.intern(taskType))
+
+    return projectTaskData
+
+#----------------------------------------------#
+class TaskFilter(object):
+    '''
+    The task filters selected in the report options.  Filters the tasks
+    endpoint applies itself are sent with every task request and all of
+    the filters are applied again to each page of tasks received, so the
+    report is the same whether or not the server filtered the tasks.
+    The owner filter needs the owner's name so it is applied once the
+    task's users have been resolved.
+    '''
+
+    def __init__(self, reportOptions):
+        self.taskStatus = reportOptions["taskStatus"]  # all/open/closed
+        self.taskPriorities = set(reportOptions["taskPriority"])  # Lower case, empty for all
+        self.taskTypes = set(reportOptions["taskType"])  # Lower case, empty for all
+        self.taskOwners = set(reportOptions["taskOwner"])  # Lower case, empty for all
+        self.createdFrom = reportOptions["createdFrom"]  # YYYY-MM-DD or empty
+        self.createdTo = reportOptions["createdTo"]  # YYYY-MM-DD or empty
+
+        self.filterTasks = self.taskStatus != "all" or self.taskPriorities or self.taskTypes or self.createdFrom or self.createdTo
+
+        # The filters pushed down to the tasks endpoint, named after the task fields it returns
+        self.queryParameters = {}
+        if self.taskStatus != "all":
+            self.queryParameters["closed"] = "true" if self.taskStatus == "closed" else "false"
+        if len(self.taskPriorities) == 1:
+            self.queryParameters["priority"] = list(self.taskPriorities)[0].capitalize()
+
+    #------------------------------------------#
+    def filter_tasks(self, tasks):
+
+        if not self.filterTasks:
+            return tasks
+
+        filteredTasks = [task for task in tasks if self.matches_task(task)]
+        report_metrics.add_count("tasksFiltered", len(tasks) - len(filteredTasks))
+
+        return filteredTasks
+
+    #------------------------------------------#
+    def matches_task(self, task):
+
+        if self.taskStatus != "all" and bool(task["closed"]) != (self.taskStatus == "closed"):
+            return False
+        if self.taskPriorities and str(task["priority"]).lower() not in self.taskPriorities:
+            return False
+        if self.taskTypes and task["taskName"].split(" ")[0].lower() not in self.taskTypes:
+            return False
+
+        # Dates are compared as YYYY-MM-DD strings
+        createdDate = task["createdDate"][:10]
+        if self.createdFrom and createdDate < self.createdFrom:
+            return False
+        if self.createdTo and createdDate > self.createdTo:
+            return False
+
+        return True
+
+    #------------------------------------------#
+    def matches_owner(self, taskOwner):
+        return not self.taskOwners or " ".join(taskOwner.lower().split()) in self.taskOwners
+
+#----------------------------------------------#
+class TaskSummary(object):
+    '''
+    Task counts rolled up by project, owner, status, priority, task type
+    and age, each split into open and closed tasks.  Tasks are added one
+    at a time as they are created so the rollups never need another pass
+    over the task data, which streamed task data could not provide.
+    '''
+
+    summaryDimensions = ["project", "owner", "status", "priority", "taskType", "age"]
+    ageBuckets = [(7, "0-7 days"), (30, "8-30 days"), (90, "31-90 days"), (365, "91-365 days"), (None, "Over 365 days")]
+    unknownAge = "Unknown"
+
+    def __init__(self, summaryDate=None):
+        self.summaryDate = summaryDate or date.today()
+        self.taskCounts = {summaryDimension : collections.Counter() for summaryDimension in self.summaryDimensions}
+        self.dateAgeBuckets = {}  # Tasks created on the same day share an age bucket
+        self.numTasks = 0
+
+    #------------------------------------------#
+    def add_task(self, projectName, task):
+
+        # Counted by value and closed (True/False) so each rollup can be split by status
+        taskClosed = task.taskStatus == "Closed"
+        taskCounts = self.taskCounts
+
+        taskCounts["project"][projectName, taskClosed] += 1
+        taskCounts["owner"][task.taskOwner, taskClosed] += 1
+        taskCounts["status"][task.taskStatus, taskClosed] += 1
+        taskCounts["priority"][task.priority, taskClosed] += 1
+        taskCounts["taskType"][task.taskType, taskClosed] += 1
+        taskCounts["age"][self.get_age_bucket(task.createdDate), taskClosed] += 1
+
+        self.numTasks += 1
+
+    #------------------------------------------#
+    def get_age_bucket(self, createdDate):
+
+        ageBucket = self.dateAgeBuckets.get(createdDate)
+
+        if ageBucket is None:
+            try:
+                taskAge = (self.summaryDate - date.fromisoformat(createdDate)).days
+            except ValueError:
+                ageBucket = self.unknownAge
+            else:
+                for maxAge, ageBucket in self.ageBuckets:
+                    if maxAge is None or taskAge <= maxAge:
+                        break
+
+            self.dateAgeBuckets[createdDate] = ageBucket
+
+        return ageBucket
+
+    #------------------------------------------#
+    def get_rollup(self, summaryDimension):
+        '''
+        Return [value, tasks, open tasks, closed tasks] for each value of
+        the dimension, with the age buckets in age order and everything
+        else by the number of tasks.
+        '''
+        rollupCounts = {}
+        for (value, taskClosed), numTasks in self.taskCounts[summaryDimension].items():
+            rollupCounts.setdefault(value, [value, 0, 0, 0])
+            rollupCounts[value][1] += numTasks
+            rollupCounts[value][3 if taskClosed else 2] += numTasks
+
+        if summaryDimension == "age":
+            bucketOrder = [ageBucket for _, ageBucket in self.ageBuckets] + [self.unknownAge]
+            return sorted(rollupCounts.values(), key=lambda rollupRow: bucketOrder.index(rollupRow[0]))
+
+        return sorted(rollupCounts.values(), key=lambda rollupRow: (-rollupRow[1], str(rollupRow[0])))
+
 #----------------------------------------------#
 def create_project_hierarchy(project, parentID, projectList, baseURL):
     logger.debug("Entering create_project_hierarchy")
 
-    # Are there more child projects for this project?
-    if len(project["childProject"]):
+    # Walk the hierarchy with an explicit stack so a deep hierarchy cannot hit the
+    # recursion limit.  Children are pushed in reverse name order so they are
+    # listed depth first and sorted by name at each level as before
+    projectStack = [(childProject, parentID) for childProject in sorted(project["childProject"], key = lambda i: i['name'], reverse=True)]
 
-        # Sort by project name of child projects
-        for childProject in sorted(project["childProject"], key = lambda i: i['name'] ) :
+    while projectStack:
+        childProject, parentID = projectStack.pop()
 
-            nodeDetails = {}
-            nodeDetails["projectID"] = childProject["id"]
-            nodeDetails["parent"] = parentID
-            nodeDetails["projectName"] = childProject["name"]
-            nodeDetails["projectLink"] = baseURL + "/codeinsight/FNCI#myprojectdetails/?id=" + str(childProject["id"]) + "&tab=projectInventory"
-            nodeDetails["inventoryLinkBase"] = nodeDetails["projectLink"]  + "&pinv="
+        nodeDetails = {}
+        nodeDetails["projectID"] = childProject["id"]
+        nodeDetails["parent"] = parentID
+        nodeDetails["projectName"] = childProject["name"]
+        nodeDetails["projectLink"] = baseURL + "/codeinsight/FNCI#myprojectdetails/?id=" + str(childProject["id"]) + "&tab=projectInventory"
+        nodeDetails["inventoryLinkBase"] = nodeDetails["projectLink"]  + "&pinv="
 
-            projectList.append( nodeDetails )
+        projectList.append( nodeDetails )
 
-            create_project_hierarchy(childProject, childProject["id"], projectList, baseURL)
+        projectStack += [(grandchildProject, childProject["id"]) for grandchildProject in sorted(childProject["childProject"], key = lambda i: i['name'], reverse=True)]
 
     return projectList
-    
\ No newline at end of file
+
+#----------------------------------------------#
+def discover_project_hierarchy(reportSession, projectID, includeChildProjects, concurrentRequests):
+    '''
+    Build the project hierarchy one level at a time, requesting the
+    direct children of every project in a level at the same time.
+    Child project lists are cached so subtrees seen within the cache
+    TTL are not requested again.  Returns the same nested structure
+    as get_child_projects_recursively.
+    '''
+    logger.info("Entering discover_project_hierarchy")
+
+    projectChildren, projectCachedOn = report_cache.load_project_children(reportSession.baseURL)
+    newProjectChildren = {}
+    cachedProjectIDs = []
+
+    # The project ID comes from the command line but the API returns numeric IDs
+    rootProjectID = report_cache.convert_cache_id(str(projectID))
+
+    projectNodes = {}
+    projectLevel = [rootProjectID]
+    numLevels = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrentRequests)) as executor:
+        while projectLevel:
+            numLevels += 1
+
+            uncachedProjectIDs = [levelProjectID for levelProjectID in projectLevel if levelProjectID not in projectChildren]
+            cachedProjectIDs += [levelProjectID for levelProjectID in projectLevel if levelProjectID in projectChildren]
+            logger.debug("    Level %s has %s projects (%s cached)" %(numLevels, len(projectLevel), len(projectLevel) - len(uncachedProjectIDs)))
+
+            for levelProjectID, childProjectResponse in zip(uncachedProjectIDs, executor.map(reportSession.get_child_projects, uncachedProjectIDs)):
+                projectDetails = {}
+                projectDetails["name"] = childProjectResponse["name"]
+                projectDetails["children"] = [[childProject["id"], childProject["name"]] for childProject in childProjectResponse["childProject"]]
+
+                projectChildren[levelProjectID] = projectDetails
+                newProjectChildren[levelProjectID] = projectDetails
+
+            nextProjectLevel = []
+            for levelProjectID in projectLevel:
+                projectNode = projectNodes.setdefault(levelProjectID, {"id" : levelProjectID, "name" : projectChildren[levelProjectID]["name"], "childProject" : []})
+
+                if includeChildProjects != "true":
+                    continue
+
+                for childProjectID, childProjectName in projectChildren[levelProjectID]["children"]:
+                    # Guard against a project appearing twice in the hierarchy
+                    if childProjectID in projectNodes:
+                        continue
+
+                    childNode = {"id" : childProjectID, "name" : childProjectName, "childProject" : []}
+                    projectNodes[childProjectID] = childNode
+                    projectNode["childProject"].append(childNode)
+                    nextProjectLevel.append(childProjectID)
+
+            projectLevel = nextProjectLevel
+
+    report_cache.save_project_children(reportSession.baseURL, newProjectChildren)
+
+    # New child projects do not appear until the cached lists expire so say how old they are
+    if cachedProjectIDs:
+        cachedMinutes = int((time.time() - min(projectCachedOn[cachedProjectID] for cachedProjectID in cachedProjectIDs)) // 60)
+        logger.info("    Used cached child projects for %s of %s projects, cached up to %s minutes ago" %(len(cachedProjectIDs), len(projectNodes), cachedMinutes))
+        print("    Using the project hierarchy cached up to %s minutes ago for %s of %s projects" %(cachedMinutes, len(cachedProjectIDs), len(projectNodes)))
+
+    logger.debug("    Discovered %s projects across %s levels (%s requested)" %(len(projectNodes), numLevels, len(newProjectChildren)))
+    logger.info("Exiting discover_project_hierarchy")
+
+    return projectNodes[rootProjectID]
+
+
+#----------------------------------------------#
+def collect_project_tasks(reportSession, projectList, concurrentRequests, taskQuery=None):
+    logger.info("Entering collect_project_tasks")
+
+    projectIDs = [project["projectID"] for project in projectList]
+
+    if concurrentRequests <= 1 or len(projectIDs) <= 1:
+        logger.debug("    Collecting tasks for %s project(s) sequentially" %len(projectIDs))
+        projectTaskResponses = [get_project_tasks(reportSession, projectID, taskQuery) for projectID in projectIDs]
+    else:
+        numWorkers = min(concurrentRequests, len(projectIDs))
+        logger.debug("    Collecting tasks for %s projects using %s workers" %(len(projectIDs), numWorkers))
+        print("    Collecting tasks for %s projects using %s workers" %(len(projectIDs), numWorkers))
+
+        # map returns the results in the order of the submitted project IDs
+        with ThreadPoolExecutor(max_workers=numWorkers) as executor:
+            projectTaskResponses = list(executor.map(lambda projectID: get_project_tasks(reportSession, projectID, taskQuery), projectIDs))
+
+    logger.info("Exiting collect_project_tasks")
+    return projectTaskResponses
+
+#----------------------------------------------#
+def get_project_tasks(reportSession, projectID, taskQuery=None):
+    logger.debug("    Getting tasks for project %s" %projectID)
+
+    try:
+        taskDataResponse = reportSession.get_all_tasks_for_project(projectID, taskQuery)
+    except:
+        logger.error("    No Task Information Returned for project %s!" %projectID)
+        print("No Task Information Returned for project %s." %projectID)
+        taskDataResponse = []
+
+    return taskDataResponse
+
+#----------------------------------------------#
+def sync_project_tasks(reportSession, projectList, concurrentRequests):
+    logger.info("Entering sync_project_tasks")
+
+    baseURL = reportSession.baseURL
+
+    snapshotConnection = report_cache.open_task_snapshots()
+    syncTime = time.time()
+
+    # Determine what needs to be requested for each project based on the stored snapshot
+    projectSyncDetails = []
+    for project in projectList:
+        projectID = project["projectID"]
+        lastSync, lastFullSync = report_cache.get_project_sync_times(snapshotConnection, baseURL, projectID)
+
+        if lastFullSync is None or syncTime - lastFullSync >= report_cache.taskSnapshotMaxAge:
+            projectSyncDetails.append((projectID, None))
+        else:
+            projectSyncDetails.append((projectID, lastSync))
+
+    numFullSyncs = len([lastSync for _, lastSync in projectSyncDetails if lastSync is None])
+    logger.debug("    %s projects require a full sync, %s an incremental sync" %(numFullSyncs, len(projectSyncDetails) - numFullSyncs))
+    print("    Syncing tasks for %s projects (%s full, %s incremental)" %(len(projectSyncDetails), numFullSyncs, len(projectSyncDetails) - numFullSyncs))
+
+    if concurrentRequests <= 1 or len(projectSyncDetails) <= 1:
+        taskSyncResponses = [get_project_task_changes(reportSession, projectID, lastSync) for projectID, lastSync in projectSyncDetails]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrentRequests, len(projectSyncDetails))) as executor:
+            taskSyncResponses = list(executor.map(lambda syncDetails: get_project_task_changes(reportSession, *syncDetails), projectSyncDetails))
+
+    # sqlite connections are not shared across threads so merge from here
+    projectTaskResponses = []
+    staleProjectIDs = []
+    for (projectID, lastSync), (taskDataResponse, fullSync) in zip(projectSyncDetails, taskSyncResponses):
+        if taskDataResponse is None:
+            # Report from whatever was last stored rather than failing the project
+            projectTaskResponses.append(report_cache.get_project_snapshot(snapshotConnection, baseURL, projectID))
+            staleProjectIDs.append(projectID)
+        else:
+            projectTaskResponses.append(report_cache.merge_project_snapshot(snapshotConnection, baseURL, projectID, syncTime, taskDataResponse, fullSync))
+
+    snapshotConnection.close()
+
+    report_metrics.add_count("staleProjects", len(staleProjectIDs))
+
+    logger.info("Exiting sync_project_tasks")
+    return projectTaskResponses, staleProjectIDs
+
+#----------------------------------------------#
+def get_project_task_changes(reportSession, projectID, lastSync):
+    # Returns the tasks and whether they are every task for the project, or None if the tasks could not be requested
+
+    try:
+        if lastSync is not None:
+            # Overlap the previous sync slightly to allow for clock differences with the server
+            updatedSince = datetime.fromtimestamp(lastSync - taskSyncOverlap).strftime("%Y-%m-%d %H:%M:%S")
+            taskDataResponse = reportSession.get_tasks_updated_since(projectID, updatedSince)
+
+            # None when the server does not support incremental sync
+            if taskDataResponse is not None:
+                return taskDataResponse, False
+
+        return reportSession.get_all_tasks_for_project(projectID), True
+    except:
+        logger.error("    Unable to sync tasks for project %s.  Using stored snapshot." %projectID)
+        print("Unable to sync tasks for project %s.  Using stored snapshot." %projectID)
+        return None, False
+
+#----------------------------------------------#
+def resolve_users(reportSession, userIDs, concurrentRequests, userData=None):
+    logger.info("Entering resolve_users")
+
+    baseURL = reportSession.baseURL
+
+    # Start with any names still valid from previous report runs unless
+    # a stream is resolving users page by page into the same dict
+    if userData is None:
+        userData = report_cache.load_user_directory(baseURL)
+    unresolvedUserIDs = [userID for userID in userIDs if userID not in userData]
+
+    logger.debug("    %s unique users, %s need to be looked up" %(len(userIDs), len(unresolvedUserIDs)))
+
+    newUserData = {}
+
+    # For a large number of users a few pages of the full user list is cheaper than one call per user
+    if len(unresolvedUserIDs) >= bulkUserLookupThreshold:
+        unresolvedUserIDSet = set(unresolvedUserIDs)
+        try:
+            for userDetails in reportSession.get_all_users():
+                if userDetails["id"] in unresolvedUserIDSet:
+                    newUserData[userDetails["id"]] = userDetails["firstName"] + " " + userDetails["lastName"]
+        except:
+            logger.error("    Unable to get the list of all users.  Looking up users individually.")
+
+        userData.update(newUserData)
+        unresolvedUserIDs = [userID for userID in unresolvedUserIDs if userID not in newUserData]
+
+    if concurrentRequests <= 1 or len(unresolvedUserIDs) <= 1:
+        userNames = [get_user_full_name(reportSession, userID) for userID in unresolvedUserIDs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrentRequests, len(unresolvedUserIDs))) as executor:
+            userNames = list(executor.map(lambda userID: get_user_full_name(reportSession, userID), unresolvedUserIDs))
+
+    for userID, userFullName in zip(unresolvedUserIDs, userNames):
+        if userFullName is None:
+            # Show the ID in the report but do not cache the failed lookup
+            userData[userID] = str(userID)
+        else:
+            userData[userID] = userFullName
+            newUserData[userID] = userFullName
+
+    report_cache.save_user_directory(baseURL, newUserData)
+
+    logger.info("Exiting resolve_users")
+    return userData
+
+#----------------------------------------------#
+def get_user_full_name(reportSession, userID):
+    logger.debug("    Getting details for user %s" %userID)
+
+    try:
+        userDetails = reportSession.get_user_details_by_id(userID)
+        userFullName = userDetails[0]["firstName"] + " " + userDetails[0]["lastName"]
+    except:
+        logger.error("    Unable to get details for user %s" %userID)
+        userFullName = None
+
+    return userFullName
+
+#----------------------------------------------#
+def stream_project_task_data(reportSession, projectList, concurrentRequests, taskSummary, taskFilter):
+    logger.info("Entering stream_project_task_data")
+
+    taskPages = fetch_task_pages(reportSession, projectList, concurrentRequests, taskFilter.queryParameters)
+
+    # Each page is filtered as it arrives so no users are looked up for tasks outside the filters
+    filteredTaskPages = ((project, taskFilter.filter_tasks(taskPage)) for project, taskPage in taskPages)
+    resolvedTaskPages = resolve_task_page_users(reportSession, filteredTaskPages, concurrentRequests)
+
+    for project, taskPage, userData in resolvedTaskPages:
+        for task in taskPage:
+            taskDetails = create_task_details(task, userData)
+            if taskFilter.matches_owner(taskDetails.taskOwner):
+                taskSummary.add_task(project["projectName"], taskDetails)
+                yield project, taskDetails
+
+    logger.info("Exiting stream_project_task_data")
+
+#----------------------------------------------#
+def resolve_task_page_users(reportSession, taskPages, concurrentRequests):
+
+    userData = report_cache.load_user_directory(reportSession.baseURL)
+
+    for project, taskPage in taskPages:
+        userIDs = set()
+        for task in taskPage:
+            userIDs.add(task["ownerId"])
+            userIDs.add(task["createdById"])
+
+        if not userIDs.issubset(userData):
+            resolve_users(reportSession, userIDs, concurrentRequests, userData)
+
+        yield project, taskPage, userData
+
+#----------------------------------------------#
+def fetch_task_pages(reportSession, projectList, concurrentRequests, taskQuery=None):
+    logger.info("Entering fetch_task_pages")
+
+    # Up to concurrentRequests projects are fetched ahead of the project being consumed but
+    # each only holds a single page at a time so memory does not grow with the task count
+    stopFetching = threading.Event()
+    projectIterator = iter(projectList)
+    projectPageQueues = collections.deque()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrentRequests))
+
+    def start_next_project():
+        project = next(projectIterator, None)
+        if project is not None:
+            pageQueue = queue.Queue(maxsize=1)
+            executor.submit(queue_task_pages, reportSession, project["projectID"], pageQueue, stopFetching, taskQuery)
+            projectPageQueues.append((project, pageQueue))
+
+    try:
+        for _ in range(max(1, concurrentRequests)):
+            start_next_project()
+
+        while projectPageQueues:
+            project, pageQueue = projectPageQueues.popleft()
+
+            taskPage = pageQueue.get()
+            while taskPage is not None:
+                yield project, taskPage
+                taskPage = pageQueue.get()
+
+            start_next_project()
+    finally:
+        # Release any workers still waiting to hand over a page if the stream is abandoned
+        stopFetching.set()
+        executor.shutdown(wait=False)
+
+    logger.info("Exiting fetch_task_pages")
+
+#----------------------------------------------#
+def queue_task_pages(reportSession, projectID, pageQueue, stopFetching, taskQuery=None):
+    logger.debug("    Streaming tasks for project %s" %projectID)
+
+    def put_page(taskPage):
+        while not stopFetching.is_set():
+            try:
+                pageQueue.put(taskPage, timeout=1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for taskPage in reportSession.iterate_task_pages_for_project(projectID, taskQuery):
+            if not put_page(taskPage):
+                return
+    except:
+        logger.error("    No Task Information Returned for project %s!" %projectID)
+        print("No Task Information Returned for project %s." %projectID)
+
+    # None marks the end of the project's tasks
+    put_page(None)
@@ -9,8 +9,8 @@ File : report_errors.py
 '''
 
 import logging
-import os
-import base64
+
+import report_assets
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,7 @@ def create_error_report(reportData):
     htmlFile = generate_error_report(reportData)
     
     reports["viewable"] = htmlFile
+    reports["viewablePages"] = []
     reports["allFormats"] = [htmlFile]
 
     logger.info("Exiting create_report_artifacts")
@@ -34,11 +35,6 @@ def create_error_report(reportData):
 def generate_error_report(reportData):
     logger.info("    Entering generate_error_report")
 
-    scriptDirectory = os.path.dirname(os.path.realpath(__file__))
-    cssFile =  os.path.join(scriptDirectory, "html-assets/css/revenera_common.css")
-    logoImageFile =  os.path.join(scriptDirectory, "html-assets/images/logo_reversed.svg")
-    iconFile =  os.path.join(scriptDirectory, "html-assets/images/favicon-revenera.ico")
-    
     reportName = "Report Creation Failure"
     reportName = reportData["reportName"] + "_Error"
     projectID = reportData["projectID"]
@@ -46,10 +42,8 @@ def generate_error_report(reportData):
 
     errorMsg = reportData["errorMsg"]
 
-    #########################################################
-    #  Encode the image files
-    encodedLogoImage = encodeImage(logoImageFile)
-    encodedfaviconImage = encodeImage(iconFile)
+    # The minified css and encoded images are prepared once and cached
+    brandingAssets = report_assets.get_branding_assets()
 
     # Grab the current date/time for report date stamp
     htmlFile = reportName.replace(" ", "_") + "-" + str(projectID) + "-" + fileNameTimeStamp + ".html"
@@ -76,23 +70,8 @@ def generate_error_report(reportData):
     ''')
 
 
-    html_ptr.write("        <style>\n")
-
-    # Add the contents of the css file to the head block
-    try:
-        f_ptr = open(cssFile)
-        logger.debug("Adding css file details")
-        for line in f_ptr:
-            html_ptr.write("            %s" %line)
-        f_ptr.close()
-    except:
-        logger.error("Unable to open %s" %cssFile)
-        print("Unable to open %s" %cssFile)
-
-
-    html_ptr.write("        </style>\n")  
-
-    html_ptr.write("    	<link rel='icon' type='image/png' href='data:image/png;base64, {}'>\n".format(encodedfaviconImage.decode('utf-8')))
+    html_ptr.write("        <style>%s</style>\n" %brandingAssets["css"])
+    html_ptr.write("    	<link rel='icon' type='image/png' href='data:image/png;base64, {}'>\n".format(brandingAssets["favicon"]))
     html_ptr.write("        <title>%s</title>\n" %(reportName))
     html_ptr.write("    </head>\n") 
 
@@ -105,7 +84,7 @@ def generate_error_report(reportData):
     html_ptr.write("<!-- BEGIN HEADER -->\n")
     html_ptr.write("<div class='header'>\n")
     html_ptr.write("  <div class='logo'>\n")
-    html_ptr.write("    <img src='data:image/svg+xml;base64,{}' style='width: 400px;'>\n".format(encodedLogoImage.decode('utf-8')))
+    html_ptr.write("    <img src='data:image/svg+xml;base64,{}' style='width: 400px;'>\n".format(brandingAssets["logo"]))
     html_ptr.write("  </div>\n")
     html_ptr.write("<div class='report-title'>%s</div>\n" %reportName)
     html_ptr.write("</div>\n")
@@ -149,18 +128,3 @@ def generate_error_report(reportData):
 
     logger.info("    Exiting generate_error_report")
     return htmlFile
-
-
-####################################################################
-def encodeImage(imageFile):
-
-    #############################################
-    # Create base64 variable for branding image
-    try:
-        with open(imageFile,"rb") as image:
-            logger.debug("Encoding image: %s" %imageFile)
-            encodedImage = base64.b64encode(image.read())
-            return encodedImage
-    except:
-        logger.error("Unable to open %s" %imageFile)
-        raise
\ No newline at end of file
@@ -0,0 +1,144 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_logging.py
+'''
+
+import logging
+import logging.handlers
+import os
+import queue
+import atexit
+
+logLevelVariable = "PROJECT_TASK_REPORT_LOG_LEVEL"  # Log level used when the report option is not set
+defaultLogLevel = "info"
+taskLoggerName = "report_data.tasks"  # Per task details are only logged at the tasks level
+
+logLevels = {}
+logLevels["error"] = logging.ERROR
+logLevels["warning"] = logging.WARNING
+logLevels["info"] = logging.INFO
+logLevels["debug"] = logging.DEBUG
+logLevels["tasks"] = logging.DEBUG
+
+logFormat = '%(asctime)s,%(msecs)d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s'
+logDateFormat = '%Y-%m-%d:%H:%M:%S'
+
+logListener = None
+logHandler = None  # The handler added to the root logger once logging is configured
+activeLogLevel = None  # The name of the level last set, for passing to other processes
+
+#-------------------------------------------------------------------#
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    '''
+    Pass log records to the queue without formatting them.  The
+    formatting and the file write are both done by the listener thread
+    so logging costs the calling thread little more than a queue put.
+    '''
+
+    def prepare(self, record):
+        # Tracebacks hold frames that may change, so only they are rendered now
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+#-------------------------------------------------------------------#
+class ForwardedRecordHandler(logging.Handler):
+    # Hand a record received from another process to this process's handlers
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+#-------------------------------------------------------------------#
+def get_default_log_level():
+    logLevel = os.environ.get(logLevelVariable, "").strip().lower()
+    return logLevel if logLevel in logLevels else defaultLogLevel
+
+#-------------------------------------------------------------------#
+def configure_logging(logfileName, logLevel=None, logQueue=None, recordFormat=logFormat):
+    '''
+    Send all log records through a queue to a listener thread that
+    writes them to logfileName, replacing any existing log file.  A
+    multiprocessing queue can be given so other processes can forward
+    their records to the same file (see forward_logging).
+    '''
+    global logListener, logHandler
+
+    if logHandler is not None:
+        set_log_level(logLevel or get_default_log_level())
+        return
+
+    fileHandler = logging.FileHandler(logfileName, mode="w")
+    fileHandler.setFormatter(logging.Formatter(recordFormat, datefmt=logDateFormat))
+
+    if logQueue is None:
+        logQueue = queue.SimpleQueue()
+        logHandler = DeferredQueueHandler(logQueue)
+    else:
+        # Records are pickled onto a multiprocessing queue so they are formatted first
+        logHandler = logging.handlers.QueueHandler(logQueue)
+
+    logListener = logging.handlers.QueueListener(logQueue, fileHandler)
+    logListener.start()
+
+    logging.getLogger().addHandler(logHandler)
+
+    set_log_level(logLevel or get_default_log_level())
+
+    # Write out anything still queued when the report exits
+    atexit.register(stop_logging)
+
+#-------------------------------------------------------------------#
+def forward_logging(logQueue, logLevel=None):
+    '''
+    Send this process's log records to the listener of the process that
+    created logQueue instead of writing a log file of its own.  Later
+    calls to configure_logging only change the level.
+    '''
+    global logHandler
+
+    if logHandler is not None:
+        return
+
+    logHandler = logging.handlers.QueueHandler(logQueue)
+    logging.getLogger().addHandler(logHandler)
+
+    set_log_level(logLevel or get_default_log_level())
+
+#-------------------------------------------------------------------#
+def receive_process_logging(logQueue):
+    '''
+    Log the records that other processes forward to logQueue (see
+    forward_logging) as if they were logged by this process.  The
+    returned listener must be stopped once the processes have finished.
+    '''
+    processListener = logging.handlers.QueueListener(logQueue, ForwardedRecordHandler())
+    processListener.start()
+
+    return processListener
+
+#-------------------------------------------------------------------#
+def set_log_level(logLevel):
+    global activeLogLevel
+
+    logLevel = logLevel.lower()
+    activeLogLevel = logLevel
+
+    logging.getLogger().setLevel(logLevels[logLevel])
+
+    # Logging every task is expensive for large reports so it has its own level
+    if logLevel == "tasks":
+        logging.getLogger(taskLoggerName).setLevel(logging.DEBUG)
+    else:
+        logging.getLogger(taskLoggerName).setLevel(logging.INFO)
+
+#-------------------------------------------------------------------#
+def stop_logging():
+    global logListener
+
+    if logListener is not None:
+        logListener.stop()
+        logListener = None
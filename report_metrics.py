@@ -0,0 +1,157 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_metrics.py
+'''
+
+import logging
+import os
+import sys
+import time
+import json
+import tempfile
+import threading
+import contextlib
+
+logger = logging.getLogger(__name__)
+
+metricsFile = os.path.join(os.path.dirname(os.path.realpath(__file__)), "_project_task_report_metrics.json")
+prometheusFileVariable = "PROJECT_TASK_REPORT_PROMETHEUS_FILE"  # Path of a textfile collector file to also write
+prometheusPrefix = "project_task_report_"
+
+runMetrics = {}
+metricsLock = threading.Lock()
+
+#-------------------------------------------------------------------#
+def start_run(reportName, version, projectID, reportID):
+    global runMetrics
+
+    with metricsLock:
+        runMetrics = {}
+        runMetrics["reportName"] = reportName
+        runMetrics["version"] = version
+        runMetrics["projectID"] = projectID
+        runMetrics["reportID"] = reportID
+        runMetrics["startTime"] = time.time()
+        runMetrics["status"] = "running"
+        runMetrics["phases"] = {}
+        runMetrics["counts"] = {}
+        runMetrics["startCounter"] = time.perf_counter()
+
+#-------------------------------------------------------------------#
+@contextlib.contextmanager
+def phase(phaseName):
+    '''
+    Time a phase of the report.  A phase that is entered more than once
+    accumulates its time.
+    '''
+    logger.debug("Starting phase %s" %phaseName)
+    startTime = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsedTime = time.perf_counter() - startTime
+        with metricsLock:
+            runMetrics.setdefault("phases", {})
+            runMetrics["phases"][phaseName] = runMetrics["phases"].get(phaseName, 0) + elapsedTime
+        logger.debug("Finished phase %s in %.3fs" %(phaseName, elapsedTime))
+
+#-------------------------------------------------------------------#
+def add_count(countName, value):
+    with metricsLock:
+        runMetrics.setdefault("counts", {})
+        runMetrics["counts"][countName] = runMetrics["counts"].get(countName, 0) + value
+
+#-------------------------------------------------------------------#
+def set_status(status):
+    with metricsLock:
+        runMetrics["status"] = status
+
+#-------------------------------------------------------------------#
+def get_peak_rss():
+
+    # The resource module is not available on Windows
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peakRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes while macOS reports bytes
+    if sys.platform == "darwin":
+        return peakRSS
+    return peakRSS * 1024
+
+#-------------------------------------------------------------------#
+def finish_run(requestSummary):
+    logger.info("Entering finish_run")
+
+    with metricsLock:
+        runMetrics["seconds"] = time.perf_counter() - runMetrics.pop("startCounter", time.perf_counter())
+        runMetrics["peakRSSBytes"] = get_peak_rss()
+        runMetrics.setdefault("counts", {})
+        runMetrics.setdefault("phases", {})
+
+        # A run that failed before its session was created has no request summary
+        if requestSummary is not None:
+            runMetrics["counts"]["apiRequests"] = requestSummary["requests"]
+            runMetrics["counts"]["apiErrors"] = requestSummary["errors"]
+            runMetrics["counts"]["apiBytes"] = requestSummary["bytes"]
+            runMetrics["counts"]["apiSeconds"] = requestSummary["seconds"]
+            runMetrics["counts"]["uploadBytes"] = requestSummary["uploadBytes"]
+            runMetrics["counts"]["uploadSeconds"] = requestSummary["uploadSeconds"]
+
+        finishedMetrics = json.loads(json.dumps(runMetrics))
+
+    for phaseName, phaseSeconds in finishedMetrics["phases"].items():
+        logger.info("    Phase %s took %.3fs" %(phaseName, phaseSeconds))
+
+    write_metrics_file(metricsFile, json.dumps(finishedMetrics, indent=4))
+
+    prometheusFile = os.environ.get(prometheusFileVariable)
+    if prometheusFile:
+        write_metrics_file(prometheusFile, format_prometheus_metrics(finishedMetrics))
+
+    logger.info("Exiting finish_run")
+    return finishedMetrics
+
+#-------------------------------------------------------------------#
+def format_prometheus_metrics(finishedMetrics):
+
+    prometheusLines = []
+
+    def add_metric(metricName, helpText, metricValues):
+        prometheusLines.append("# HELP %s%s %s" %(prometheusPrefix, metricName, helpText))
+        prometheusLines.append("# TYPE %s%s gauge" %(prometheusPrefix, metricName))
+        for metricLabels, metricValue in metricValues:
+            prometheusLines.append("%s%s%s %s" %(prometheusPrefix, metricName, metricLabels, metricValue))
+
+    add_metric("last_run_timestamp_seconds", "Time the last report run started.", [("", finishedMetrics["startTime"])])
+    add_metric("last_run_success", "1 if the last report run completed without an error report.", [("", int(finishedMetrics["status"] == "success"))])
+    add_metric("run_seconds", "Duration of the last report run.", [("", finishedMetrics["seconds"])])
+    add_metric("phase_seconds", "Duration of each phase of the last report run.", [('{phase="%s"}' %phaseName, phaseSeconds) for phaseName, phaseSeconds in sorted(finishedMetrics["phases"].items())])
+    add_metric("count", "Counts recorded during the last report run.", [('{name="%s"}' %countName, countValue) for countName, countValue in sorted(finishedMetrics["counts"].items())])
+
+    if finishedMetrics["peakRSSBytes"] is not None:
+        add_metric("peak_rss_bytes", "Peak resident memory of the last report run.", [("", finishedMetrics["peakRSSBytes"])])
+
+    return "\n".join(prometheusLines) + "\n"
+
+#-------------------------------------------------------------------#
+def write_metrics_file(outputFile, metricsText):
+
+    try:
+        outputDirectory = os.path.dirname(os.path.abspath(outputFile))
+
+        # Move the file into place so a collector never reads a partial file
+        fileDescriptor, tempFile = tempfile.mkstemp(dir=outputDirectory, suffix=".tmp")
+        with os.fdopen(fileDescriptor, "w") as f_ptr:
+            f_ptr.write(metricsText)
+        os.chmod(tempFile, 0o644)  # mkstemp creates the file readable only by its owner
+        os.replace(tempFile, outputFile)
+    except OSError:
+        logger.warning("Unable to write metrics file %s" %outputFile)
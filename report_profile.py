@@ -0,0 +1,146 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_profile.py
+'''
+
+import logging
+import os
+import io
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+profileVariable = "PROJECT_TASK_REPORT_PROFILE"  # Set to profile every run without changing the report options
+outputDirectory = os.path.dirname(os.path.realpath(__file__))
+profileStatsFile = os.path.join(outputDirectory, "_project_task_report.prof")
+profileSummaryFile = os.path.join(outputDirectory, "_project_task_report_profile.txt")
+allocationsFile = os.path.join(outputDirectory, "_project_task_report_allocations.txt")
+
+tracebackFrames = 10  # Frames kept by tracemalloc for each allocation
+numProfileLines = 60  # Functions listed in the profile summary
+numAllocationSites = 25  # Allocation sites listed for each memory snapshot
+
+activeProfile = {}
+
+#-------------------------------------------------------------------#
+def profiling_requested():
+    return os.environ.get(profileVariable, "").strip().lower() not in ["", "0", "false", "no"]
+
+#-------------------------------------------------------------------#
+def start_profiling(profileReason):
+    '''
+    Profile the rest of the run with cProfile and trace memory
+    allocations with tracemalloc until stop_profiling is called.
+    '''
+    if activeProfile:
+        return
+
+    # The profilers are imported here so runs that are not profiled do not load them
+    import cProfile
+    import tracemalloc
+
+    logger.info("Profiling enabled by %s" %profileReason)
+    print("    Profiling enabled by %s" %profileReason)
+
+    threadProfilers = []
+
+    def profile_thread(*args):
+        # Called on the first event in each new thread and replaces itself with a profiler for that thread
+        sys.setprofile(None)
+        threadProfiler = cProfile.Profile()
+        try:
+            threadProfiler.enable()
+        except ValueError:
+            return  # Python 3.12+ already profiles every thread from the main profiler
+        threadProfilers.append(threadProfiler)
+
+    tracemalloc.start(tracebackFrames)
+
+    mainProfiler = cProfile.Profile()
+    threading.setprofile(profile_thread)
+    mainProfiler.enable()
+
+    activeProfile["mainProfiler"] = mainProfiler
+    activeProfile["threadProfilers"] = threadProfilers
+    activeProfile["snapshots"] = []
+
+#-------------------------------------------------------------------#
+def take_snapshot(snapshotLabel):
+    # Record the live allocations at a point of interest such as after the data is collected
+    if not activeProfile:
+        return
+
+    import tracemalloc
+    activeProfile["snapshots"].append((snapshotLabel, tracemalloc.get_traced_memory(), tracemalloc.take_snapshot()))
+
+#-------------------------------------------------------------------#
+def stop_profiling():
+    if not activeProfile:
+        return
+
+    logger.info("Entering stop_profiling")
+
+    import pstats
+    import tracemalloc
+
+    activeProfile["mainProfiler"].disable()
+    threading.setprofile(None)
+
+    take_snapshot("end of run")
+    peakTracedMemory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    profileStats = pstats.Stats(activeProfile["mainProfiler"])
+    for threadProfiler in activeProfile["threadProfilers"]:
+        profileStats.add(threadProfiler)
+
+    profileStats.dump_stats(profileStatsFile)
+    write_profile_summary(profileStats)
+    write_allocations(activeProfile["snapshots"], peakTracedMemory)
+
+    activeProfile.clear()
+
+    logger.info("Profile written to %s, %s and %s" %(profileStatsFile, profileSummaryFile, allocationsFile))
+    print("    Profile written to %s" %outputDirectory)
+    logger.info("Exiting stop_profiling")
+
+#-------------------------------------------------------------------#
+def write_profile_summary(profileStats):
+
+    profileSummary = io.StringIO()
+    profileStats.stream = profileSummary
+
+    profileSummary.write("Sorted by cumulative time (%s threads profiled)\n" %(len(activeProfile["threadProfilers"]) + 1))
+    profileStats.sort_stats("cumulative").print_stats(numProfileLines)
+    profileSummary.write("\nSorted by internal time\n")
+    profileStats.sort_stats("tottime").print_stats(numProfileLines)
+
+    try:
+        with open(profileSummaryFile, "w") as profile_ptr:
+            profile_ptr.write(profileSummary.getvalue())
+    except OSError:
+        logger.warning("Unable to write profile summary %s" %profileSummaryFile)
+
+#-------------------------------------------------------------------#
+def write_allocations(snapshots, peakTracedMemory):
+    import tracemalloc
+
+    try:
+        with open(allocationsFile, "w") as allocations_ptr:
+            allocations_ptr.write("Peak traced memory: %.1f MB\n" %(peakTracedMemory / 1048576))
+
+            # Ignore the memory used by tracemalloc and the import machinery
+            snapshotFilters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>"), tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")]
+
+            for snapshotLabel, (currentMemory, _), snapshot in snapshots:
+                allocations_ptr.write("\nTop %s allocation sites at %s (%.1f MB traced)\n" %(numAllocationSites, snapshotLabel, currentMemory / 1048576))
+
+                for statistic in snapshot.filter_traces(snapshotFilters).statistics("lineno")[:numAllocationSites]:
+                    frame = statistic.traceback[0]
+                    allocations_ptr.write("    %10.1f KB %8s blocks  %s:%s\n" %(statistic.size / 1024, statistic.count, frame.filename, frame.lineno))
+    except OSError:
+        logger.warning("Unable to write allocation summary %s" %allocationsFile)
@@ -0,0 +1,413 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_session.py
+'''
+
+import logging
+import os
+import socket
+import threading
+import queue
+import time
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+requestTimeout = (10, 300)  # Seconds for the connect and read portions of a request
+pageSize = 1000  # Records requested per call for paged endpoints
+uploadChunkSize = 1024 * 1024  # Bytes sent at a time when uploading the report archive
+uploadPipeChunks = 8  # Chunks the archive writer can get ahead of the upload
+
+#-------------------------------------------------------------------#
+def parameter_rejected(error):
+    # A 4xx other than an authorization or throttling response means the server did not accept a query parameter
+    statusCode = error.response.status_code
+    return 400 <= statusCode < 500 and statusCode not in [401, 403, 429]
+
+#-------------------------------------------------------------------#
+class KeepAliveAdapter(HTTPAdapter):
+    # Enable TCP keep-alive so pooled connections survive idle periods between phases of the report
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(*args, **kwargs)
+
+#-------------------------------------------------------------------#
+class ReportSession(object):
+    '''
+    A single pooled HTTP session used for every Code Insight REST call
+    made while creating a report.  Connections are reused across the
+    hierarchy, task, user and upload requests and the timing of each
+    request is recorded.
+    '''
+
+    def __init__(self, baseURL, authToken, poolSize=8):
+        self.baseURL = baseURL
+        self.apiBaseURL = str(baseURL) + "/codeinsight/api/"
+
+        # pool_block keeps the number of open connections at the collection concurrency
+        adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=poolSize, pool_block=True)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Authorization": "Bearer " + str(authToken), "Connection": "keep-alive"})
+
+        self.requestTimings = []
+        self.uploadTimings = []
+        self.timingLock = threading.Lock()
+        self.taskQuerySupported = True  # Until the tasks endpoint rejects the task filters
+        self.taskSyncSupported = True  # Until the tasks endpoint rejects updatedSince
+
+        logger.debug("Created report session for %s with a pool size of %s" %(baseURL, poolSize))
+
+    #---------------------------------------------------------------#
+    def request(self, method, endpoint, **kwargs):
+        kwargs.setdefault("timeout", requestTimeout)
+
+        startTime = time.perf_counter()
+        response = self.session.request(method, self.apiBaseURL + endpoint, **kwargs)
+        elapsedTime = time.perf_counter() - startTime
+
+        requestTiming = {}
+        requestTiming["method"] = method
+        requestTiming["endpoint"] = endpoint
+        requestTiming["status"] = response.status_code
+        requestTiming["seconds"] = elapsedTime
+        requestTiming["bytes"] = len(response.content)
+
+        with self.timingLock:
+            self.requestTimings.append(requestTiming)
+
+        # Logged for every request so the message is only built if debug logging is enabled
+        logger.debug("    %s %s - %s in %.3fs", method, endpoint, response.status_code, elapsedTime)
+
+        response.raise_for_status()
+        return response
+
+    #---------------------------------------------------------------#
+    def get_page_of_data(self, endpoint, apiParameters, offset):
+        response = self.request("GET", endpoint, params=dict(apiParameters, offset=offset, limit=pageSize))
+        return response.json()["data"]
+
+    #---------------------------------------------------------------#
+    def iterate_paged_data(self, endpoint, apiParameters):
+        offset = 1
+
+        while True:
+            pageOfData = self.get_page_of_data(endpoint, apiParameters, offset)
+
+            if pageOfData:
+                yield pageOfData
+
+            if len(pageOfData) < pageSize:
+                return
+            offset += 1
+
+    #---------------------------------------------------------------#
+    def get_paged_data(self, endpoint, apiParameters):
+        pagedData = []
+
+        for pageOfData in self.iterate_paged_data(endpoint, apiParameters):
+            pagedData += pageOfData
+
+        return pagedData
+
+    #---------------------------------------------------------------#
+    def get_child_projects_recursively(self, projectID):
+        response = self.request("GET", "project/%s/childProjects" %projectID, params={"recursive": "true"})
+        return response.json()["data"]
+
+    #---------------------------------------------------------------#
+    def get_child_projects(self, projectID):
+        # Only the direct children of the project
+        response = self.request("GET", "project/%s/childProjects" %projectID, params={"recursive": "false"})
+        return response.json()["data"]
+
+    #---------------------------------------------------------------#
+    # taskQuery holds any task filters the tasks endpoint applies itself (see report_data.TaskFilter)
+    def get_all_tasks_for_project(self, projectID, taskQuery=None):
+        projectTasks = []
+
+        for taskPage in self.iterate_task_pages_for_project(projectID, taskQuery):
+            projectTasks += taskPage
+
+        return projectTasks
+
+    #---------------------------------------------------------------#
+    def get_task_page_for_project(self, projectID, offset, taskQuery=None):
+
+        if not taskQuery or not self.taskQuerySupported:
+            return self.get_page_of_data("tasks", {"projectId": projectID}, offset)
+
+        try:
+            return self.get_page_of_data("tasks", dict(taskQuery, projectId=projectID), offset)
+        except requests.HTTPError as error:
+            if not parameter_rejected(error):
+                raise
+
+            # The callers filter every page themselves so the tasks are requested without the filters from now on
+            if self.taskQuerySupported:
+                self.taskQuerySupported = False
+                logger.error("    The tasks endpoint rejected the task filters %s (%s).  Requesting all tasks and filtering them locally" %(taskQuery, error.response.status_code))
+                print("    The server does not support the task filters.  Tasks will be filtered locally")
+
+            return self.get_page_of_data("tasks", {"projectId": projectID}, offset)
+
+    #---------------------------------------------------------------#
+    def iterate_task_pages_for_project(self, projectID, taskQuery=None):
+        offset = 1
+
+        while True:
+            taskPage = self.get_task_page_for_project(projectID, offset, taskQuery)
+
+            if taskPage:
+                yield taskPage
+
+            if len(taskPage) < pageSize:
+                return
+            offset += 1
+
+    #---------------------------------------------------------------#
+    def get_tasks_updated_since(self, projectID, updatedSince):
+        # None when the tasks endpoint does not support updatedSince so the caller can download every task instead
+
+        if not self.taskSyncSupported:
+            return None
+
+        try:
+            return self.get_paged_data("tasks", {"projectId": projectID, "updatedSince": updatedSince})
+        except requests.HTTPError as error:
+            if not parameter_rejected(error):
+                raise
+
+            if self.taskSyncSupported:
+                self.taskSyncSupported = False
+                logger.warning("    The tasks endpoint rejected updatedSince (%s).  Downloading every task instead of the changes" %error.response.status_code)
+                print("    The server does not support incremental task sync.  Every task will be downloaded")
+
+            return None
+
+    #---------------------------------------------------------------#
+    def get_user_details_by_id(self, userID):
+        response = self.request("GET", "users", params={"id": userID})
+        return response.json()["data"]
+
+    #---------------------------------------------------------------#
+    def get_all_users(self):
+        return self.get_paged_data("users", {})
+
+    #---------------------------------------------------------------#
+    def upload_project_report_data(self, projectID, reportID, uploadZipfile, progressCallback=None):
+        # The file is read a chunk at a time rather than loaded into memory
+        with open(uploadZipfile, "rb") as zip_ptr:
+            fileChunks = iter(lambda: zip_ptr.read(uploadChunkSize), b"")
+            uploadBody = SizedUploadBody(os.path.basename(uploadZipfile), fileChunks, os.path.getsize(uploadZipfile), progressCallback)
+            self.send_upload(projectID, reportID, uploadBody)
+
+    #---------------------------------------------------------------#
+    def upload_project_report_stream(self, projectID, reportID, uploadZipfile, fileChunks, progressCallback=None):
+        # The size is not known until the archive is finished so the body is sent chunked
+        uploadBody = UploadBody(uploadZipfile, fileChunks, progressCallback)
+        self.send_upload(projectID, reportID, uploadBody)
+
+    #---------------------------------------------------------------#
+    def send_upload(self, projectID, reportID, uploadBody):
+        startTime = time.perf_counter()
+        self.request("POST", "projects/%s/reports/%s/data" %(projectID, reportID), data=uploadBody, headers={"Content-Type": uploadBody.contentType})
+        elapsedTime = time.perf_counter() - startTime
+
+        uploadTiming = {}
+        uploadTiming["bytes"] = uploadBody.bytesSent
+        uploadTiming["seconds"] = elapsedTime
+        uploadTiming["bytesPerSecond"] = uploadBody.bytesSent / elapsedTime if elapsedTime else 0
+
+        with self.timingLock:
+            self.uploadTimings.append(uploadTiming)
+
+        logger.info("Uploaded %s bytes in %.2fs (%.2f MB/s)" %(uploadTiming["bytes"], elapsedTime, uploadTiming["bytesPerSecond"] / (1024 * 1024)))
+
+    #---------------------------------------------------------------#
+    def get_request_summary(self):
+        with self.timingLock:
+            requestTimings = list(self.requestTimings)
+
+        requestSummary = {}
+        requestSummary["requests"] = len(requestTimings)
+        requestSummary["seconds"] = sum(timing["seconds"] for timing in requestTimings)
+        requestSummary["bytes"] = sum(timing["bytes"] for timing in requestTimings)
+        requestSummary["errors"] = len([timing for timing in requestTimings if timing["status"] >= 400])
+
+        with self.timingLock:
+            requestSummary["uploadBytes"] = sum(timing["bytes"] for timing in self.uploadTimings)
+            requestSummary["uploadSeconds"] = sum(timing["seconds"] for timing in self.uploadTimings)
+
+        return requestSummary
+
+    #---------------------------------------------------------------#
+    def log_request_summary(self):
+        requestSummary = self.get_request_summary()
+        logger.info("Report session made %s requests (%s errors) totalling %.2fs and %s bytes" %(requestSummary["requests"], requestSummary["errors"], requestSummary["seconds"], requestSummary["bytes"]))
+
+    #---------------------------------------------------------------#
+    def start_report(self, authToken):
+        # A session kept open by the report worker is reused with the token of each new report
+        self.session.headers.update({"Authorization": "Bearer " + str(authToken)})
+
+        with self.timingLock:
+            self.requestTimings = []
+            self.uploadTimings = []
+
+    #---------------------------------------------------------------#
+    def close(self):
+        self.log_request_summary()
+        self.session.close()
+
+#-------------------------------------------------------------------#
+class ReportSessionCache(object):
+    '''
+    Keep a ReportSession open per server and pool size so reports run
+    one after another by the report worker reuse the same connections.
+    '''
+
+    def __init__(self):
+        self.reportSessions = {}
+
+    #---------------------------------------------------------------#
+    def get_session(self, baseURL, authToken, poolSize):
+        reportSession = self.reportSessions.get((baseURL, poolSize))
+
+        if reportSession is None:
+            reportSession = ReportSession(baseURL, authToken, poolSize)
+            self.reportSessions[(baseURL, poolSize)] = reportSession
+        else:
+            logger.debug("Reusing report session for %s with a pool size of %s" %(baseURL, poolSize))
+            reportSession.start_report(authToken)
+
+        return reportSession
+
+    #---------------------------------------------------------------#
+    def close(self):
+        for reportSession in self.reportSessions.values():
+            reportSession.close()
+        self.reportSessions = {}
+
+#-------------------------------------------------------------------#
+class UploadBody(object):
+    '''
+    A multipart/form-data body generated as it is sent.  The file
+    content comes from an iterable of byte chunks so only one chunk is
+    held in memory at a time.  progressCallback, if given, is called
+    with the total bytes sent and the size of the latest chunk.
+    '''
+
+    def __init__(self, fileName, fileChunks, progressCallback=None):
+        boundary = uuid.uuid4().hex
+        self.contentType = "multipart/form-data; boundary=%s" %boundary
+        self.header = ("--%s\r\nContent-Disposition: form-data; name=\"file\"; filename=\"%s\"\r\nContent-Type: application/zip\r\n\r\n" %(boundary, fileName)).encode("utf-8")
+        self.trailer = ("\r\n--%s--\r\n" %boundary).encode("utf-8")
+        self.fileChunks = fileChunks
+        self.progressCallback = progressCallback
+        self.bytesSent = 0
+
+    #---------------------------------------------------------------#
+    def __iter__(self):
+        yield self.header
+
+        for fileChunk in self.fileChunks:
+            self.bytesSent += len(fileChunk)
+            if self.progressCallback is not None:
+                self.progressCallback(self.bytesSent, len(fileChunk))
+            yield fileChunk
+
+        yield self.trailer
+
+#-------------------------------------------------------------------#
+class SizedUploadBody(UploadBody):
+    # A known length lets requests send a Content-Length instead of chunked encoding
+
+    def __init__(self, fileName, fileChunks, fileSize, progressCallback=None):
+        super().__init__(fileName, fileChunks, progressCallback)
+        self.fileSize = fileSize
+
+    def __len__(self):
+        return len(self.header) + self.fileSize + len(self.trailer)
+
+#-------------------------------------------------------------------#
+class UploadPipe(object):
+    '''
+    A write only file object that hands what is written to the upload
+    as chunks so the report archive can be uploaded while it is still
+    being written.  The queue is bounded so the writer only gets a few
+    chunks ahead of the upload and memory use stays flat.
+    '''
+
+    def __init__(self):
+        self.chunks = queue.Queue(maxsize=uploadPipeChunks)
+        self.buffer = bytearray()
+        self.cancelled = threading.Event()
+        self.error = None
+
+    #---------------------------------------------------------------#
+    def write(self, data):
+        self.buffer += data
+
+        while len(self.buffer) >= uploadChunkSize:
+            self.put_chunk(bytes(self.buffer[:uploadChunkSize]))
+            del self.buffer[:uploadChunkSize]
+
+        return len(data)
+
+    #---------------------------------------------------------------#
+    def flush(self):
+        pass
+
+    #---------------------------------------------------------------#
+    def close(self):
+        # Called by the writer once the archive is complete
+        if self.buffer:
+            self.put_chunk(bytes(self.buffer))
+            self.buffer = bytearray()
+        self.put_chunk(None)
+
+    #---------------------------------------------------------------#
+    def abort(self, error):
+        # Called by the writer if the archive could not be completed
+        self.error = error
+        try:
+            self.put_chunk(None)
+        except OSError:
+            pass  # The upload has already stopped reading
+
+    #---------------------------------------------------------------#
+    def cancel(self):
+        # Called by the reader so a writer waiting on a failed upload stops
+        self.cancelled.set()
+
+    #---------------------------------------------------------------#
+    def put_chunk(self, chunk):
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+        raise OSError("Report upload was cancelled")
+
+    #---------------------------------------------------------------#
+    def __iter__(self):
+        while True:
+            chunk = self.chunks.get()
+
+            if chunk is None:
+                if self.error is not None:
+                    raise OSError("Unable to create report archive: %s" %self.error)
+                return
+
+            yield chunk
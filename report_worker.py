@@ -0,0 +1,223 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : report_worker.py
+
+A long running local worker that creates reports handed to it over a
+Unix socket so each report does not pay for python startup, imports,
+new connections and cold caches.
+
+    python3 report_worker.py serve
+    python3 report_worker.py submit -pid 1 -rid 2 -authToken ... -reportOpts ...
+
+submit passes its arguments to create_report.main in the worker and
+relays the report's output.  It exits with workerUnavailableExitCode
+when no worker is running so create_report.sh can create the report
+itself instead.
+'''
+import sys
+import os
+import json
+import socket
+
+socketVariable = "PROJECT_TASK_REPORT_SOCKET"  # Overrides the default socket path
+defaultSocketFile = os.path.join(os.path.dirname(os.path.realpath(__file__)), "_project_task_report.sock")
+workerUnavailableExitCode = 75  # EX_TEMPFAIL
+exitMarker = "__REPORT_WORKER_EXIT__ "  # Final line sent to the client with the report's exit code
+
+#----------------------------------------------------------------------#
+class WorkerShutdown(BaseException):
+    # Raised by SIGTERM so the worker stops even while it is creating a report
+    pass
+
+#----------------------------------------------------------------------#
+def get_socket_file():
+    return os.environ.get(socketVariable) or defaultSocketFile
+
+#----------------------------------------------------------------------#
+def submit_report(socketFile, reportArgs):
+
+    # Only the standard library is used here so a submission starts quickly
+    try:
+        workerSocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        workerSocket.connect(socketFile)
+    except (OSError, AttributeError):
+        return workerUnavailableExitCode
+
+    reportRequest = {}
+    reportRequest["args"] = reportArgs
+    reportRequest["workingDirectory"] = os.getcwd()
+
+    receivedOutput = False
+
+    with workerSocket:
+        workerSocket.sendall(json.dumps(reportRequest).encode("utf-8") + b"\n")
+
+        for outputLine in workerSocket.makefile("r", encoding="utf-8", errors="replace"):
+            if outputLine.startswith(exitMarker):
+                return int(outputLine[len(exitMarker):])
+
+            receivedOutput = True
+            sys.stdout.write(outputLine)
+            sys.stdout.flush()
+
+    # The worker went away.  If the report had not started it can still be created locally
+    return 1 if receivedOutput else workerUnavailableExitCode
+
+#----------------------------------------------------------------------#
+def worker_running(socketFile):
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as workerSocket:
+            workerSocket.connect(socketFile)
+        return True
+    except OSError:
+        return False
+
+#----------------------------------------------------------------------#
+class ClientOutput(object):
+    # Send the report's output to the client without failing the report if the client disconnects
+
+    def __init__(self, clientFile):
+        self.clientFile = clientFile
+        self.connected = True
+
+    def write(self, text):
+        if self.connected:
+            try:
+                self.clientFile.write(text.encode("utf-8"))
+            except OSError:
+                self.connected = False
+        return len(text)
+
+    def flush(self):
+        pass
+
+#----------------------------------------------------------------------#
+def serve_reports(socketFile):
+    import socketserver
+    import signal
+    import threading
+    import logging
+    import contextlib
+    import traceback
+
+    # Everything the reports need is imported once when the worker starts
+    # since create_report only imports most of it when a report uses it
+    import create_report
+    import report_assets
+    import report_profile
+    import report_session
+    import report_data
+    import report_async
+    import report_artifacts
+    import report_errors
+    import report_logging
+
+    logger = logging.getLogger("report_worker")
+
+    sessionCache = report_session.ReportSessionCache()
+    report_assets.get_branding_assets()
+
+    shutdownRequested = threading.Event()
+
+    #------------------------------------------------------------------#
+    class ReportRequestHandler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            requestLine = self.rfile.readline()
+            if not requestLine:
+                return  # A check for a running worker rather than a report
+
+            reportRequest = json.loads(requestLine.decode("utf-8"))
+            clientOutput = ClientOutput(self.wfile)
+
+            logger.info("Worker creating report in %s" %reportRequest["workingDirectory"])
+
+            workerDirectory = os.getcwd()
+            exitCode = 0
+
+            # Reports are created one at a time so the working directory and stdout can be switched for each one
+            with contextlib.redirect_stdout(clientOutput), contextlib.redirect_stderr(clientOutput):
+                try:
+                    os.chdir(reportRequest["workingDirectory"])
+                    create_report.main(reportRequest["args"], sessionCache)
+                except WorkerShutdown:
+                    logger.warning("Report worker stopped while creating a report")
+                except SystemExit as error:
+                    exitCode = error.code if isinstance(error.code, int) else 1
+                except Exception:
+                    logger.exception("Report failed in the report worker")
+                    traceback.print_exc()
+                    exitCode = 1
+                finally:
+                    report_profile.stop_profiling()
+                    os.chdir(workerDirectory)
+
+            # The report may not have finished, or a collection step may have swallowed the
+            # shutdown, so have the client create the report itself
+            if shutdownRequested.is_set():
+                exitCode = workerUnavailableExitCode
+
+            clientOutput.write("%s%s\n" %(exitMarker, exitCode))
+
+            if shutdownRequested.is_set():
+                raise WorkerShutdown()
+
+    if worker_running(socketFile):
+        print("A report worker is already listening on %s" %socketFile)
+        return
+
+    # Remove the socket of a worker that did not shut down cleanly
+    if os.path.exists(socketFile):
+        os.remove(socketFile)
+
+    # The socket is only usable by this user since reports include an authorization token
+    previousUmask = os.umask(0o177)
+    try:
+        reportServer = socketserver.UnixStreamServer(socketFile, ReportRequestHandler)
+    finally:
+        os.umask(previousUmask)
+
+    def stop_worker(signalNumber, frame):
+        shutdownRequested.set()
+        raise WorkerShutdown()
+
+    signal.signal(signal.SIGTERM, stop_worker)
+
+    # Only once this is the running worker, since the log file is replaced
+    report_logging.configure_logging(create_report.logfileName)
+
+    print("Report worker listening on %s" %socketFile)
+    logger.info("Report worker listening on %s" %socketFile)
+
+    try:
+        reportServer.serve_forever()
+    except (KeyboardInterrupt, SystemExit, WorkerShutdown):
+        pass
+    finally:
+        reportServer.server_close()
+        sessionCache.close()
+        if os.path.exists(socketFile):
+            os.remove(socketFile)
+        logger.info("Report worker stopped")
+
+#----------------------------------------------------------------------#
+def main():
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ["serve", "submit"]:
+        print("Usage: %s serve | submit <create_report.py arguments>" %sys.argv[0])
+        return 2
+
+    if sys.argv[1] == "serve":
+        serve_reports(get_socket_file())
+        return 0
+
+    return submit_report(get_socket_file(), sys.argv[2:])
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    sys.exit(main())
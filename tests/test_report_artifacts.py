@@ -0,0 +1,122 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : test_report_artifacts.py
+
+    python -m unittest discover tests
+'''
+import sys
+import os
+import io
+import csv
+import json
+import zipfile
+import tempfile
+import unittest
+
+testDirectory = os.path.dirname(os.path.realpath(__file__))
+reportDirectory = os.path.dirname(testDirectory)
+sys.path.insert(0, reportDirectory)
+
+import report_artifacts
+import report_data
+
+#----------------------------------------------------------------------#
+def create_report_data():
+
+    reportOptions = {}
+    reportOptions["dataExports"] = ["csv", "jsonl"]
+
+    project = {}
+    project["projectID"] = 1
+    project["projectName"] = "Project 1"
+    project["projectLink"] = "https://codeinsight.example.com/project/1"
+    project["inventoryLinkBase"] = "https://codeinsight.example.com/project/1&pinv="
+
+    reportData = {}
+    reportData["reportName"] = "Project Task Report"
+    reportData["projectName"] = project["projectName"]
+    reportData["projectID"] = project["projectID"]
+    reportData["fileNameTimeStamp"] = "20261018-120000"
+    reportData["projectList"] = [project]
+    reportData["reportOptions"] = reportOptions
+    reportData["taskSummary"] = report_data.TaskSummary()
+
+    return reportData, project
+
+#----------------------------------------------------------------------#
+def create_task(almIssues):
+    return report_data.TaskRecord(inventoryId=1, summary="Review the license", priority="High", almIssues=almIssues,
+        taskCreator="User 1", taskOwner="User 2", createdDate="2026-10-01", createdTime="10:00:00", taskStatus="Open", taskType="Review")
+
+#----------------------------------------------------------------------#
+class TestReportWriters(unittest.TestCase):
+
+    #------------------------------------------------------------------#
+    def setUp(self):
+        # The writers create their files in the working directory
+        self.workingDirectory = os.getcwd()
+        self.outputDirectory = tempfile.TemporaryDirectory()
+        os.chdir(self.outputDirectory.name)
+
+    #------------------------------------------------------------------#
+    def tearDown(self):
+        os.chdir(self.workingDirectory)
+        self.outputDirectory.cleanup()
+
+    #------------------------------------------------------------------#
+    def write_tasks(self, writerFormat, tasks):
+        reportData, project = create_report_data()
+
+        rowWriter = report_artifacts.reportWriters[writerFormat](reportData)
+        for task in tasks:
+            rowWriter.write_task(project, task)
+
+        return rowWriter.close()
+
+    #------------------------------------------------------------------#
+    def test_missing_external_key(self):
+        task = create_task((("https://jira.example.com/browse/CI-1", "CI-1"), ("https://jira.example.com/browse/CI-2", None)))
+
+        xlsxFile = self.write_tasks("xlsx", [task])
+        with zipfile.ZipFile(xlsxFile) as xlsx_zip:
+            self.assertIn(">CI-1, </t>", xlsx_zip.read("xl/worksheets/sheet1.xml").decode("utf-8"))
+
+        csvFile = self.write_tasks("csv", [task])
+        with open(csvFile, newline="", encoding="utf-8") as csv_ptr:
+            self.assertEqual(list(csv.DictReader(csv_ptr))[0]["externalIssues"], "CI-1;")
+
+        jsonlFile = self.write_tasks("jsonl", [task])
+        with open(jsonlFile, encoding="utf-8") as jsonl_ptr:
+            self.assertEqual(json.loads(jsonl_ptr.readline())["externalIssues"][1], {"key" : None, "link" : "https://jira.example.com/browse/CI-2"})
+
+
+#----------------------------------------------------------------------#
+class TestTaskDataJSON(unittest.TestCase):
+
+    #------------------------------------------------------------------#
+    def test_summary_cannot_change_script_parsing(self):
+        reportData, project = create_report_data()
+        taskSummary = "<!--<script> & </script><b>"
+        task = create_task((("https://jira.example.com/browse/CI-1?a=1&b=2", "CI-<1>"),))._replace(summary=taskSummary)
+
+        html_ptr = io.StringIO()
+        report_artifacts.write_task_data_json(html_ptr, [(project, task)])
+        scriptBlock = html_ptr.getvalue()
+
+        # Only the script tags written by the report remain
+        scriptContent = scriptBlock[len("<script>\n"):-len("</script>\n")]
+        for htmlCharacter in "<>&":
+            self.assertNotIn(htmlCharacter, scriptContent)
+
+        # The values are unchanged once the json is parsed
+        taskRow = json.loads(scriptContent.split("var taskRows = [\n")[1].split(",\n")[0])
+        self.assertEqual(taskRow[2], taskSummary)
+        self.assertEqual(taskRow[9], [["https://jira.example.com/browse/CI-1?a=1&b=2", "CI-<1>"]])
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : test_report_async.py
+
+    python -m unittest discover tests
+'''
+import sys
+import os
+import asyncio
+import time
+import tempfile
+import unittest
+
+testDirectory = os.path.dirname(os.path.realpath(__file__))
+reportDirectory = os.path.dirname(testDirectory)
+sys.path.insert(0, reportDirectory)
+sys.path.insert(0, os.path.join(reportDirectory, "benchmarks"))
+
+import mock_server
+import report_async
+import report_cache
+import report_data
+import report_session
+
+callTimeout = 5  # Seconds before a call waiting on the limiter is treated as hung
+
+#----------------------------------------------------------------------#
+def malformed_task_page(*args):
+    # What the session raises when a response has no data
+    return {}["data"]
+
+#----------------------------------------------------------------------#
+def task_page(*args):
+    return [{"id" : 1}]
+
+#----------------------------------------------------------------------#
+class TestAsyncCollectorCall(unittest.TestCase):
+
+    #------------------------------------------------------------------#
+    def run_collector(self, collectorCalls):
+
+        async def run_calls():
+            asyncCollector = report_async.AsyncCollector(None, 2, None)
+            try:
+                return await asyncio.wait_for(collectorCalls(asyncCollector), callTimeout)
+            finally:
+                asyncCollector.executor.shutdown()
+
+        return asyncio.run(run_calls())
+
+    #------------------------------------------------------------------#
+    def test_unexpected_exception_releases_slot(self):
+
+        async def collectorCalls(asyncCollector):
+            # More failures than the limiter has slots, then a call that must still get one
+            for _ in range(asyncCollector.limiter.maxLimit + 1):
+                with self.assertRaises(KeyError):
+                    await asyncCollector.call("tasks", malformed_task_page)
+
+            self.assertEqual(asyncCollector.limiter.inFlight, 0)
+            return await asyncCollector.call("tasks", task_page)
+
+        self.assertEqual(self.run_collector(collectorCalls), [{"id" : 1}])
+
+    #------------------------------------------------------------------#
+    def test_cancelled_call_releases_slot(self):
+
+        async def collectorCalls(asyncCollector):
+            blockedCall = asyncio.ensure_future(asyncCollector.call("tasks", time.sleep, 0.2))
+            await asyncio.sleep(0.05)
+            blockedCall.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await blockedCall
+
+            self.assertEqual(asyncCollector.limiter.inFlight, 0)
+            return await asyncCollector.call("tasks", task_page)
+
+        self.assertEqual(self.run_collector(collectorCalls), [{"id" : 1}])
+
+
+#----------------------------------------------------------------------#
+class TestAsyncCollectorThrottling(unittest.TestCase):
+    '''
+    Collect a hierarchy of 3 projects with 3 pages of tasks each from
+    the mock server while it throttles or slows down task requests.
+    '''
+
+    #------------------------------------------------------------------#
+    def setUp(self):
+        # Keep the user directory out of the report's own cache directory
+        self.cacheDirectory = tempfile.TemporaryDirectory()
+        self.reportCacheFiles = (report_cache.cacheDirectory, report_cache.userDirectoryFile)
+        report_cache.cacheDirectory = self.cacheDirectory.name
+        report_cache.userDirectoryFile = os.path.join(self.cacheDirectory.name, "user_directory.json")
+
+        # Small pages so each project takes several task requests
+        self.pageSize = report_session.pageSize
+        report_session.pageSize = 20
+
+        self.mockServer = mock_server.MockCodeInsight(depth=1, width=2, tasksPerProject=50, numUsers=10)
+        self.reportSession = report_session.ReportSession(self.mockServer.start(), "test", 4)
+
+        taskOptions = {"taskStatus" : "all", "taskPriority" : [], "taskType" : [], "taskOwner" : [], "createdFrom" : "", "createdTo" : ""}
+        self.taskFilter = report_data.TaskFilter(taskOptions)
+        self.limitHistory = []
+
+    #------------------------------------------------------------------#
+    def tearDown(self):
+        self.reportSession.close()
+        self.mockServer.stop()
+        report_session.pageSize = self.pageSize
+        report_cache.cacheDirectory, report_cache.userDirectoryFile = self.reportCacheFiles
+        self.cacheDirectory.cleanup()
+
+    #------------------------------------------------------------------#
+    def collect(self):
+
+        async def run_collector():
+            asyncCollector = report_async.AsyncCollector(self.reportSession, 4, self.taskFilter)
+            self.initialLimit = asyncCollector.limiter.limit
+
+            # Record the request limit after every request
+            limiterRelease = asyncCollector.limiter.release
+            async def release(*args):
+                await limiterRelease(*args)
+                self.limitHistory.append(asyncCollector.limiter.limit)
+            asyncCollector.limiter.release = release
+
+            try:
+                return await asyncio.wait_for(asyncCollector.collect(1, "true"), callTimeout * 2)
+            finally:
+                asyncCollector.executor.shutdown()
+
+        projectHierarchy, tasksByProject, userData = asyncio.run(run_collector())
+
+        # Every task of every project is returned once
+        self.assertEqual(sorted(tasksByProject), [1, 2, 3])
+        for projectID, projectTasks in tasksByProject.items():
+            self.assertEqual(sorted(task["id"] for task in projectTasks), [projectID * 1000000 + taskNumber for taskNumber in range(50)])
+        self.assertEqual(len(userData), 10)
+
+    #------------------------------------------------------------------#
+    def assert_limit_recovered(self):
+        # The limit was cut by the decrease factor at least once and then grew again
+        previousLimits = [self.initialLimit] + self.limitHistory[:-1]
+        reductions = [requestNumber for requestNumber, (previousLimit, limit) in enumerate(zip(previousLimits, self.limitHistory)) if limit == previousLimit * report_async.decreaseFactor]
+        self.assertTrue(reductions)
+
+        reducedLimit = self.limitHistory[reductions[0]]
+        self.assertGreater(max(self.limitHistory[reductions[0]:]), reducedLimit)
+
+    #------------------------------------------------------------------#
+    def test_throttled_pages_are_retried(self):
+        self.mockServer.inject_task_faults(3, 429, retryAfter=0)
+
+        startTime = time.monotonic()
+        self.collect()
+
+        # Retried straight away as the server asked rather than after a backoff
+        self.assertLess(time.monotonic() - startTime, 1)
+        self.assertEqual(self.mockServer.requestCounts["tasks"], 9 + 3)
+
+        # The limit came down on the first 429 and grew back as the retries succeeded
+        self.assert_limit_recovered()
+
+    #------------------------------------------------------------------#
+    def test_retry_after_is_respected(self):
+        self.mockServer.inject_task_faults(1, 503, retryAfter=1)
+
+        startTime = time.monotonic()
+        self.collect()
+
+        self.assertGreaterEqual(time.monotonic() - startTime, 1)
+        self.assertEqual(self.mockServer.requestCounts["tasks"], 9 + 1)
+
+    #------------------------------------------------------------------#
+    def test_slow_responses_reduce_limit(self):
+        # Fast pages set the baseline latency before the server slows down
+        self.mockServer.inject_task_faults(2, delay=0.0)
+        self.mockServer.inject_task_faults(2, delay=0.5)
+
+        self.collect()
+
+        # Slow responses are not errors so nothing is requested again
+        self.assertEqual(self.mockServer.requestCounts["tasks"], 9)
+        self.assert_limit_recovered()
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+File : test_report_data.py
+
+    python -m unittest discover tests
+'''
+import sys
+import os
+import tempfile
+import unittest
+
+testDirectory = os.path.dirname(os.path.realpath(__file__))
+reportDirectory = os.path.dirname(testDirectory)
+sys.path.insert(0, reportDirectory)
+sys.path.insert(0, os.path.join(reportDirectory, "benchmarks"))
+
+import mock_server
+import report_cache
+import report_data
+import report_session
+
+#----------------------------------------------------------------------#
+class TestIncrementalSync(unittest.TestCase):
+
+    #------------------------------------------------------------------#
+    def setUp(self):
+        # Keep the task snapshots out of the report's own cache directory
+        self.cacheDirectory = tempfile.TemporaryDirectory()
+        self.reportCacheFiles = (report_cache.cacheDirectory, report_cache.taskSnapshotFile)
+        report_cache.cacheDirectory = self.cacheDirectory.name
+        report_cache.taskSnapshotFile = os.path.join(self.cacheDirectory.name, "task_snapshots.db")
+
+        self.mockServer = mock_server.MockCodeInsight(depth=0, width=0, tasksPerProject=5)
+        self.reportSession = report_session.ReportSession(self.mockServer.start(), "test", 1)
+        self.projectList = [{"projectID" : 1, "projectName" : "Project 1"}]
+
+        # The first sync of a project always downloads every task
+        projectTaskResponses, staleProjectIDs = report_data.sync_project_tasks(self.reportSession, self.projectList, 1)
+        self.assertEqual(len(projectTaskResponses[0]), 5)
+        self.mockServer.reset_counts()
+
+    #------------------------------------------------------------------#
+    def tearDown(self):
+        self.reportSession.close()
+        self.mockServer.stop()
+        report_cache.cacheDirectory, report_cache.taskSnapshotFile = self.reportCacheFiles
+        self.cacheDirectory.cleanup()
+
+    #------------------------------------------------------------------#
+    def test_incremental_sync(self):
+        projectTaskResponses, staleProjectIDs = report_data.sync_project_tasks(self.reportSession, self.projectList, 1)
+
+        self.assertEqual(len(projectTaskResponses[0]), 5)
+        self.assertEqual(staleProjectIDs, [])
+        self.assertEqual(self.mockServer.requestCounts["tasks"], 1)
+
+    #------------------------------------------------------------------#
+    def test_rejected_updated_since_syncs_every_task(self):
+        self.mockServer.rejectedParameters.add("updatedSince")
+
+        projectTaskResponses, staleProjectIDs = report_data.sync_project_tasks(self.reportSession, self.projectList, 1)
+
+        # The rejected request and then a full download rather than the stored snapshot
+        self.assertEqual(len(projectTaskResponses[0]), 5)
+        self.assertEqual(staleProjectIDs, [])
+        self.assertEqual(self.mockServer.requestCounts["tasks"], 2)
+        self.assertFalse(self.reportSession.taskSyncSupported)
+
+        snapshotConnection = report_cache.open_task_snapshots()
+        lastSync, lastFullSync = report_cache.get_project_sync_times(snapshotConnection, self.reportSession.baseURL, 1)
+        snapshotConnection.close()
+        self.assertEqual(lastSync, lastFullSync)
+
+        # Later syncs in the session go straight to the full download
+        self.mockServer.reset_counts()
+        report_data.sync_project_tasks(self.reportSession, self.projectList, 1)
+        self.assertEqual(self.mockServer.requestCounts["tasks"], 1)
+
+    #------------------------------------------------------------------#
+    def test_server_error_reports_stored_snapshot_as_stale(self):
+        self.mockServer.inject_task_faults(1, 500)
+
+        projectTaskResponses, staleProjectIDs = report_data.sync_project_tasks(self.reportSession, self.projectList, 1)
+
+        self.assertEqual(len(projectTaskResponses[0]), 5)
+        self.assertEqual(staleProjectIDs, [1])
+        self.assertTrue(self.reportSession.taskSyncSupported)
+
+
+#----------------------------------------------------------------------#
+class TestHierarchyDiscovery(unittest.TestCase):
+
+    #------------------------------------------------------------------#
+    def setUp(self):
+        # Keep the child project lists out of the report's own cache directory
+        self.cacheDirectory = tempfile.TemporaryDirectory()
+        self.reportCacheFiles = (report_cache.cacheDirectory, report_cache.projectHierarchyFile)
+        report_cache.cacheDirectory = self.cacheDirectory.name
+        report_cache.projectHierarchyFile = os.path.join(self.cacheDirectory.name, "project_hierarchy.json")
+
+        self.mockServer = mock_server.MockCodeInsight(depth=2, width=2, tasksPerProject=0)
+        self.reportSession = report_session.ReportSession(self.mockServer.start(), "test", 2)
+
+    #------------------------------------------------------------------#
+    def tearDown(self):
+        self.reportSession.close()
+        self.mockServer.stop()
+        report_cache.cacheDirectory, report_cache.projectHierarchyFile = self.reportCacheFiles
+        self.cacheDirectory.cleanup()
+
+    #------------------------------------------------------------------#
+    def test_cached_hierarchy_is_logged(self):
+        with self.assertLogs("report_data", "INFO") as reportLogs:
+            projectHierarchy = report_data.discover_project_hierarchy(self.reportSession, 1, "true", 2)
+        self.assertFalse([logLine for logLine in reportLogs.output if "cached" in logLine])
+        self.assertEqual(self.mockServer.requestCounts["childProjects"], 7)
+
+        self.mockServer.reset_counts()
+        with self.assertLogs("report_data", "INFO") as reportLogs:
+            cachedHierarchy = report_data.discover_project_hierarchy(self.reportSession, 1, "true", 2)
+
+        # The second discovery comes entirely from the cache and says so
+        self.assertEqual(cachedHierarchy, projectHierarchy)
+        self.assertEqual(self.mockServer.requestCounts["childProjects"], 0)
+        self.assertIn("INFO:report_data:    Used cached child projects for 7 of 7 projects, cached up to 0 minutes ago", reportLogs.output)
+
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    unittest.main()